@@ -12,7 +12,10 @@ sys.path.append(parent_dir)
 load_dotenv()
 
 from shared.base_analyzer import BaseAnalyzer
+from shared.daemon import Daemon
 from shared.decorators import LoggerAnalyzer
+from shared.metrics import metrics
+from shared.tracing import tracer
 
 # Type aliases
 NewsItem = Record  # Database record containing news content and metadata
@@ -41,12 +44,14 @@ class FundamentalAnalyzer(BaseAnalyzer[NewsItem]):
     
     async def process_item(self, item: NewsItem) -> None:
         """Process a single news article to calculate sentiment"""
+        tracer.annotate(news_id=item["id"], issuer_id=item["issuer_id"])
         try:
             # Combine main content with attachment text
             text = item["content"] + "\n" + "\n".join(item["attachments"]) 
             
             # Calculate sentiment score
-            sentiment_score = utils.analyze_text(text)
+            with metrics.time("compute", operation="sentiment"):
+                sentiment_score = utils.analyze_text(text)
             
             # Store results
             await self.db.add_news_sentiment(
@@ -71,4 +76,8 @@ if __name__ == "__main__":
     
     analyzer = FundamentalAnalyzer(db_params)
     analyzer = LoggerAnalyzer(analyzer)
-    asyncio.run(analyzer.execute_analysis())
\ No newline at end of file
+
+    if "--daemon" in sys.argv:
+        asyncio.run(Daemon.from_env("fundamental-analyzer", analyzer.connect_db, analyzer.run_once, analyzer.cleanup).serve())
+    else:
+        asyncio.run(analyzer.execute_analysis())
@@ -1,9 +1,8 @@
 import os
 import sys
-import utils
 import asyncio
 import numpy as np
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 
@@ -12,8 +11,13 @@ sys.path.append(parent_dir)
 
 load_dotenv()
 
+import utils
 from shared.base_analyzer import BaseAnalyzer
+from shared.daemon import Daemon
 from shared.decorators import MultiProcessAnalyzer, LoggerAnalyzer
+from shared.trading_calendar import TradingCalendar
+from shared.metrics import metrics
+from shared.tracing import tracer
 
 # Type aliases
 StockPrice = Dict[str, Any]  # {'avg_price': str, 'date': str}
@@ -32,12 +36,22 @@ class LSTMAnalyzer(BaseAnalyzer[IssuerData]):
         """Initialize the LSTM analyzer"""
         super().__init__(db_params)
         self.model_path = model_path
+        self.calendar: Optional[TradingCalendar] = None
         
     async def connect_db(self) -> None:
         """Connect to database and create required tables."""
         await self.db.connect()
         await self.db.create_lstm_predictions_table()
         
+    async def load_calendar(self) -> TradingCalendar:
+        """Load the trading calendar once per process, learning no-trade days from stock history"""
+        if self.calendar is None:
+            self.calendar = TradingCalendar()
+            since = datetime.now().date() - timedelta(days=730)
+            self.calendar.learn(await self.db.get_trading_dates(since))
+
+        return self.calendar
+        
     async def fetch_items(self) -> List[IssuerData]:
         """Fetch stock data for all issuers with sufficient history"""
         issuer_data: List[IssuerData] = []
@@ -57,6 +71,7 @@ class LSTMAnalyzer(BaseAnalyzer[IssuerData]):
     async def process_item(self, item: IssuerData) -> None:
         """Process a single issuer's data to generate predictions"""
         issuer_code, issuer_id, prices = item
+        tracer.annotate(issuer=issuer_code, rows=len(prices))
         
         creation_date = await self.db.get_recent_lstm_prediction_creation_date(issuer_id)
         if creation_date and creation_date == datetime.now().date():
@@ -83,10 +98,11 @@ class LSTMAnalyzer(BaseAnalyzer[IssuerData]):
                 return
                 
             # Train LSTM model
-            model = utils.train_lstm_model(
-                X, y, sequence_length, is_large_dataset, 
-                self.model_path, issuer_id
-            )
+            with metrics.time("compute", operation="train"):
+                model = utils.train_lstm_model(
+                    X, y, sequence_length, is_large_dataset, 
+                    self.model_path, issuer_id
+                )
             
             if model is None:
                 print(f"Failed to train model for {issuer_code} - training error")
@@ -100,18 +116,20 @@ class LSTMAnalyzer(BaseAnalyzer[IssuerData]):
                 ]).reshape(-1, 1)
             )
             
-            # Generate future predictions
-            predictions = utils.generate_predictions(
-                model, scaler, last_sequence, sequence_length
-            )
+            # Generate future predictions for the next trading days
+            calendar = await self.load_calendar()
+            with metrics.time("compute", operation="predict"):
+                predictions = utils.generate_predictions(
+                    model, scaler, last_sequence, sequence_length,
+                    calendar, datetime.now().date()
+                )
             
             if not predictions:
                 print(f"Failed to generate predictions for {issuer_code} - prediction error")
                 return
                 
             # Save predictions to database
-            start_date = datetime.now().date() + timedelta(days=1)
-            await self.db.save_lstm_predictions(issuer_id, predictions, start_date)
+            await self.db.save_lstm_predictions(issuer_id, predictions)
             print(f"Successfully processed {issuer_code}")
             
         except Exception as e:
@@ -129,4 +147,8 @@ if __name__ == "__main__":
     analyzer = LSTMAnalyzer(db_params)
     analyzer = MultiProcessAnalyzer(analyzer, process_count=4)
     analyzer = LoggerAnalyzer(analyzer)
-    asyncio.run(analyzer.execute_analysis())
+
+    if "--daemon" in sys.argv:
+        asyncio.run(Daemon.from_env("lstm-analyzer", analyzer.connect_db, analyzer.run_once, analyzer.cleanup).serve())
+    else:
+        asyncio.run(analyzer.execute_analysis())
@@ -1,4 +1,5 @@
 from typing import List, Tuple, Optional
+from datetime import date
 import numpy as np
 from numpy.typing import NDArray
 from sklearn.preprocessing import MinMaxScaler
@@ -6,12 +7,14 @@ from tensorflow.keras.models import Sequential, load_model
 from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
 from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping
 import os
+from shared.trading_calendar import TradingCalendar
 
 # Type aliases
 FloatArray = NDArray[np.float64]
 ModelInput = NDArray[np.float64]
 ModelOutput = NDArray[np.float64]
 PriceData = List[str]
+Prediction = Tuple[date, float]  # (prediction_date, predicted_price)
 
 
 def prepare_lstm_data(data: PriceData, sequence_length: int) -> Tuple[FloatArray, FloatArray, MinMaxScaler]:
@@ -118,9 +121,11 @@ def generate_predictions(
     scaler: MinMaxScaler,
     last_sequence: FloatArray,
     sequence_length: int,
+    calendar: TradingCalendar,
+    last_date: date,
     days_ahead: int = 30
-) -> List[float]:
-    """Generate future price predictions using trained model"""
+) -> List[Prediction]:
+    """Generate price predictions for the trading days following last_date"""
     current_sequence = last_sequence.copy()
     predictions: List[float] = []
     
@@ -138,4 +143,5 @@ def generate_predictions(
     
     # Transform predictions back to original scale
     predictions_array = np.array(predictions).reshape(-1, 1)
-    return scaler.inverse_transform(predictions_array).flatten().tolist() 
\ No newline at end of file
+    prices = scaler.inverse_transform(predictions_array).flatten().tolist()
+    return list(zip(calendar.next_trading_days(last_date, days_ahead), prices))
@@ -13,9 +13,16 @@ class BaseAnalyzer(ABC, Generic[T]):
     async def execute_analysis(self) -> None:
         """Execute the analysis process"""
         await self.connect_db()
+
+        try:
+            await self.run_once()
+        finally:
+            await self.cleanup()
+
+    async def run_once(self) -> None:
+        """Analyze once over an already opened database pool, which a daemon keeps open between runs"""
         items = await self.fetch_items()
         await self.process_data(items)
-        await self.cleanup()    
     
     async def process_data(self, items: List[T]) -> None:
         """Process all items in sequence"""
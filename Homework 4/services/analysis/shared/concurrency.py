@@ -0,0 +1,26 @@
+import asyncio
+import reprlib
+from typing import Awaitable, Callable, List
+from .base_analyzer import T
+from .metrics import metrics
+
+
+async def process_concurrently(process_item: Callable[[T], Awaitable[None]], items: List[T], concurrency: int) -> int:
+    """Process items concurrently in the running event loop and return the number of failed items"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def process(item: T) -> bool:
+        async with semaphore:
+            try:
+                with metrics.time("item") as span:
+                    span.set(item=reprlib.repr(item))
+                    await process_item(item)
+                metrics.inc("items_processed_total", result="ok")
+                return True
+            except Exception as e:
+                metrics.inc("items_processed_total", result="failed")
+                print(f"Failed to process {item}: {e}")
+                return False
+
+    results = await asyncio.gather(*(process(item) for item in items))
+    return results.count(False)
@@ -0,0 +1,205 @@
+import os
+import json
+import signal
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from aiohttp import web
+from .metrics import metrics
+
+# Type aliases
+Step = Callable[[], Awaitable[None]]
+
+# (lowest, highest) value of every cron field; day of week 7 is another Sunday
+CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def parse_cron_field(field: str, low: int, high: int) -> Set[int]:
+    """Values of a cron field written with *, ranges, lists and steps"""
+    values: Set[int] = set()
+
+    for part in field.split(","):
+        step = 1
+
+        if "/" in part:
+            part, step_text = part.split("/")
+            step = int(step_text)
+
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = map(int, part.split("-"))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"Invalid cron field: {field}")
+
+        values.update(range(start, end + 1, step))
+
+    return values
+
+
+def dumps(value: Any) -> str:
+    return json.dumps(value, default=str)
+
+
+class CronSchedule:
+    """Five-field cron expression: minute, hour, day of month, month and day of week"""
+    def __init__(self, expression: str) -> None:
+        fields = expression.split()
+
+        if len(fields) != 5:
+            raise ValueError(f"Invalid cron expression: {expression}")
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            parse_cron_field(field, low, high) for field, (low, high) in zip(fields, CRON_FIELDS)
+        )
+        self.weekdays = {weekday % 7 for weekday in weekdays}
+        self.restricted_day = fields[2] != "*" and fields[4] != "*"
+
+    def matches_day(self, day: date) -> bool:
+        in_month = day.day in self.days
+        in_week = (day.weekday() + 1) % 7 in self.weekdays  # Cron counts weekdays from Sunday
+
+        # Like cron, a day matches either field when both of them are restricted
+        return (in_month or in_week) if self.restricted_day else (in_month and in_week)
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First scheduled minute after the given moment"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+
+        for _ in range(5 * 366):
+            if candidate.month in self.months and self.matches_day(candidate.date()):
+                for hour in sorted(hour for hour in self.hours if hour >= candidate.hour):
+                    minutes = sorted(minute for minute in self.minutes
+                                     if hour > candidate.hour or minute >= candidate.minute)
+
+                    if minutes:
+                        return candidate.replace(hour=hour, minute=minutes[0])
+
+            candidate = datetime.combine(candidate.date() + timedelta(days=1), datetime.min.time())
+
+        raise ValueError(f"Cron expression never matches: {self.expression}")
+
+
+class Daemon:
+    """Keeps an analyzer warm between runs, triggers runs on a schedule and reports health over HTTP"""
+    def __init__(self, name: str, startup: Step, run_once: Step, shutdown: Step, schedule: CronSchedule,
+                 port: int = 8080, run_on_start: bool = True, max_run_seconds: Optional[float] = None) -> None:
+        self.name = name
+        self.startup = startup
+        self.run_once = run_once
+        self.shutdown = shutdown
+        self.schedule = schedule
+        self.port = port
+        self.run_on_start = run_on_start
+        self.max_run_seconds = max_run_seconds
+        self.scheduler: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.running_since: Optional[datetime] = None
+        self.next_run: Optional[datetime] = None
+        self.last_success: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    @classmethod
+    def from_env(cls, name: str, startup: Step, run_once: Step, shutdown: Step) -> "Daemon":
+        """Daemon configured by RUN_SCHEDULE, RUN_ON_START, HEALTH_PORT and MAX_RUN_SECONDS"""
+        max_run_seconds = os.getenv("MAX_RUN_SECONDS")
+        return cls(
+            name, startup, run_once, shutdown,
+            CronSchedule(os.getenv("RUN_SCHEDULE", "0 0 * * *")),
+            int(os.getenv("HEALTH_PORT", "8080")),
+            os.getenv("RUN_ON_START", "true").lower() == "true",
+            float(max_run_seconds) if max_run_seconds else None
+        )
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "schedule": self.schedule.expression,
+            "runs": self.runs,
+            "running_since": self.running_since,
+            "next_run": self.next_run,
+            "last_success": self.last_success,
+            "last_error": self.last_error
+        }
+
+    def is_healthy(self) -> bool:
+        """The scheduler is alive and no run has been going on for longer than allowed"""
+        if self.scheduler is None or self.scheduler.done():
+            return False
+
+        if self.running_since and self.max_run_seconds:
+            return (datetime.now() - self.running_since).total_seconds() <= self.max_run_seconds
+
+        return True
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response(self.status(), status=200 if self.is_healthy() else 503, dumps=dumps)
+
+    async def ready(self, request: web.Request) -> web.Response:
+        """Ready once a run has completed, which is what the analysis_complete file used to signal"""
+        return web.json_response(self.status(), status=200 if self.last_success else 503, dumps=dumps)
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8")
+
+    async def run(self) -> None:
+        """Run once, keeping the daemon alive when the run fails"""
+        self.runs += 1
+        self.running_since = datetime.now()
+
+        try:
+            await self.run_once()
+            self.last_success = datetime.now()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = repr(e)
+            print(f"Run {self.runs} of {self.name} failed: {e!r}")
+        finally:
+            self.running_since = None
+
+    async def schedule_runs(self) -> None:
+        if self.run_on_start:
+            await self.run()
+
+        while True:
+            self.next_run = self.schedule.next_after(datetime.now())
+            print(f"Next run of {self.name} at {self.next_run:%Y-%m-%d %H:%M}")
+            await asyncio.sleep(max(0.0, (self.next_run - datetime.now()).total_seconds()))
+            self.next_run = None
+            await self.run()
+
+    async def serve(self) -> None:
+        """Serve health endpoints and scheduled runs until SIGTERM or SIGINT"""
+        loop = asyncio.get_running_loop()
+        stopping = asyncio.Event()
+
+        for signal_number in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signal_number, stopping.set)
+
+        app = web.Application()
+        app.router.add_get("/health", self.health)
+        app.router.add_get("/ready", self.ready)
+        app.router.add_get("/metrics", self.metrics)
+        metrics.served = True  # The decorators must not open a second listener, possibly on the same port
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "0.0.0.0", self.port).start()
+
+        try:
+            await self.startup()
+            self.scheduler = asyncio.create_task(self.schedule_runs())
+            stop = asyncio.create_task(stopping.wait())
+            await asyncio.wait({self.scheduler, stop}, return_when=asyncio.FIRST_COMPLETED)
+            stop.cancel()
+
+            # An interrupted run is picked up again from the run journal after the restart
+            self.scheduler.cancel()
+            await asyncio.gather(self.scheduler, return_exceptions=True)
+        finally:
+            await self.shutdown()
+            await runner.cleanup()
@@ -1,7 +1,8 @@
-from typing import Optional, List, Dict, Any, Sequence
+from typing import Optional, List, Dict, Any, Sequence, Tuple
 from asyncpg import create_pool, Pool, Record
-from datetime import timedelta, date
+from datetime import date
 import json
+from .metrics import timed
 
 # Type aliases
 StockRecord = Record  # Stock history record from database
@@ -12,23 +13,29 @@ JsonDict = Dict[str, Any]  # JSON-serializable dictionary
 class Database:
     """Database interface for market analysis operations"""
     
-    def __init__(self, user: str, password: str, database: str, host: str) -> None:
+    def __init__(self, user: str, password: str, database: str, host: str,
+                 min_size: int = 1, max_size: int = 15) -> None:
         """Initialize database connection parameters."""
         self.pool: Optional[Pool] = None
         self.user = user
         self.password = password
         self.database = database
         self.host = host
+        self.min_size = min_size
+        self.max_size = max_size
 
     async def connect(self) -> None:
-        """Create connection pool to database"""
+        """Create connection pool to database, unless it is already open"""
+        if self.pool is not None:
+            return
+
         self.pool = await create_pool(
             user=self.user,
             password=self.password,
             database=self.database,
             host=self.host,
-            min_size=1,
-            max_size=15
+            min_size=self.min_size,
+            max_size=self.max_size
         )
 
     async def close(self) -> None:
@@ -121,6 +128,7 @@ class Database:
                 await conn.execute(drop_query)
                 await conn.execute(create_query)
         
+    @timed("db_read")
     async def get_unprocessed_news(self) -> List[NewsRecord]:
         """Get unprocessed news articles"""
         query = """
@@ -133,6 +141,7 @@ class Database:
         async with self.pool.acquire() as conn:
             return await conn.fetch(query)
 
+    @timed("db_write")
     async def add_news_sentiment(self, issuer_id: int, issuer_news_id: int, sentiment: float) -> None:
         """Add sentiment analysis result for a news article"""
         query = """
@@ -144,6 +153,7 @@ class Database:
         async with self.pool.acquire() as conn:
             await conn.execute(query, issuer_id, issuer_news_id, sentiment)
 
+    @timed("db_read")
     async def get_stocks(self) -> List[StockRecord]:
         """Get stock records from the last year"""
         query = """
@@ -155,6 +165,7 @@ class Database:
         async with self.pool.acquire() as conn:
             return await conn.fetch(query)
 
+    @timed("db_read")
     async def get_stock_history(self, stock_id: int) -> List[StockRecord]:
         """Get historical data for a specific stock"""
         query = """
@@ -167,6 +178,7 @@ class Database:
         async with self.pool.acquire() as conn:
             return await conn.fetch(query, stock_id)
 
+    @timed("db_write")
     async def store_technical_analysis(self, issuer_id: int, 
                                      moving_averages: JsonDict,
                                      oscillators: JsonDict) -> int:
@@ -192,9 +204,9 @@ class Database:
                 result = await conn.fetchrow(insert_query, issuer_id, moving_averages_json, oscillators_json)
                 return result['id']
             
-    async def save_lstm_predictions(self, issuer_id: int, predictions: Sequence[float], 
-                                  start_date: date) -> None:
-        """Save LSTM model predictions for an issuer"""
+    @timed("db_write")
+    async def save_lstm_predictions(self, issuer_id: int, predictions: Sequence[Tuple[date, float]]) -> None:
+        """Save LSTM model predictions for an issuer as (prediction_date, price) pairs"""
         query = """
             INSERT INTO lstm_predictions (issuer_id, prediction_date, predicted_price)
             VALUES ($1, $2, $3)
@@ -203,10 +215,10 @@ class Database:
         """
         
         async with self.pool.acquire() as conn:
-            for i, pred in enumerate(predictions):
-                pred_date = start_date + timedelta(days=i)
+            for pred_date, pred in predictions:
                 await conn.execute(query, issuer_id, pred_date, pred)
             
+    @timed("db_read")
     async def get_issuers(self) -> List[IssuerRecord]:
         """Get all issuers"""
         query = """
@@ -215,6 +227,7 @@ class Database:
         async with self.pool.acquire() as conn:
             return await conn.fetch(query)
 
+    @timed("db_read")
     async def get_issuer_stocks(self, issuer_id: int) -> List[StockRecord]:
         """Get stock history for a specific issuer"""
         query = """
@@ -226,6 +239,7 @@ class Database:
         async with self.pool.acquire() as conn:
             return await conn.fetch(query, issuer_id)
         
+    @timed("db_read")
     async def get_recent_lstm_prediction_creation_date(self, issuer_id: int) -> Optional[date]:
         """Get recent LSTM prediction creation date for an issuer"""
         query = """
@@ -236,3 +250,13 @@ class Database:
         """
         async with self.pool.acquire() as conn:
             return await conn.fetchval(query, issuer_id)
+
+    @timed("db_read")
+    async def get_trading_dates(self, since: date) -> List[date]:
+        """Get every date since the given one that has stock history for any issuer"""
+        query = """
+            SELECT DISTINCT date FROM stockhistory
+            WHERE date >= $1
+        """
+        async with self.pool.acquire() as conn:
+            return [row["date"] for row in await conn.fetch(query, since)]
@@ -1,11 +1,11 @@
 import os
 import time
-import asyncio
-from typing import Generic, List, Type
+from typing import Generic, List, Optional
 from datetime import datetime
-from multiprocessing import Pool
+from aiohttp import web
 from .base_analyzer import BaseAnalyzer, T
-from .database import Database
+from .worker_pool import WorkerPool
+from .metrics import export_metrics, metrics, start_metrics_server
 
 class AnalyzerDecorator(BaseAnalyzer[T], Generic[T]):
     """Base decorator for adding behavior to analyzers"""
@@ -29,60 +29,100 @@ class AnalyzerDecorator(BaseAnalyzer[T], Generic[T]):
     async def process_item(self, item: T) -> None:
         return await self._analyzer.process_item(item)
     
-    async def execute_analysis(self) -> None:
-        return await self._analyzer.execute_analysis()
+    async def run_once(self) -> None:
+        return await self._analyzer.run_once()
+
+    async def cleanup(self) -> None:
+        return await self._analyzer.cleanup()
     
     
 class MultiProcessAnalyzer(AnalyzerDecorator[T]):
     """Decorator that adds multiprocessing capability to analyzers."""
     
-    def __init__(self, analyzer: BaseAnalyzer[T], process_count: int = os.cpu_count() or 1) -> None:
+    def __init__(self, analyzer: BaseAnalyzer[T], process_count: int = os.cpu_count() or 1,
+                 batch_size: int = 4, concurrency: int = 2) -> None:
         super().__init__(analyzer)
         self.process_count = process_count
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.pool: Optional[WorkerPool] = None  # Kept between the runs of a daemon, with models loaded
         
-    async def execute_analysis(self) -> None:
-        await self.connect_db()
+    async def run_once(self) -> None:
         items = await self.fetch_items()
         await self.process_data(items)
-        await self.cleanup()
         
     async def process_data(self, items: List[T]) -> None:
-        """Process items in parallel using multiple processes"""
-        with Pool(processes=self.process_count) as pool:
-            pool.starmap(process_item_worker, 
-                        [(self.original_class, item, self.db_params) for item in items])
+        """Process items in parallel using a pool of persistent worker processes"""
+        if not items:
+            return
+
+        batch_count = -(-len(items) // self.batch_size)
+        process_count = min(self.process_count, batch_count)
+
+        # A pool sized by a small earlier run, such as a resumed one, is replaced when a run needs more workers
+        if self.pool is not None and self.pool.process_count < process_count:
+            self.pool.stop()
+            self.pool = None
+
+        if self.pool is None:
+            self.pool = WorkerPool(self.original_class, self.db_params,
+                                   process_count, self.concurrency)
+            self.pool.start()
+
+        try:
+            processed, failed = await self.pool.map(items, self.batch_size)
+        except BaseException:
+            # Queued batches and dead workers must not leak into the next run of a daemon
+            self.pool.stop()
+            self.pool = None
+            raise
+
+        print(f"Processed {processed} items ({failed} failed)")
+
+    async def cleanup(self) -> None:
+        if self.pool is not None:
+            self.pool.stop()
+            self.pool = None
+
+        await super().cleanup()
     
 
 class LoggerAnalyzer(AnalyzerDecorator[T]):
-    """Decorator that adds logging capability to analyzers."""
+    """Decorator that adds logging capability and per-stage metrics to analyzers."""
     
-    def __init__(self, analyzer: BaseAnalyzer[T]) -> None:
+    def __init__(self, analyzer: BaseAnalyzer[T], metrics_port: Optional[int] = None,
+                 metrics_file: Optional[str] = None) -> None:
         super().__init__(analyzer)
+        self.metrics_port = metrics_port or int(os.getenv("METRICS_PORT", "0")) or None
+        self.metrics_file = metrics_file or os.getenv("METRICS_FILE")
+        self.metrics_server: Optional[web.AppRunner] = None  # Lives as long as the process, not one run
+        metrics.set_labels(component=self.original_class.__name__)
+
+    async def connect_db(self) -> None:
+        await super().connect_db()
+
+        if self.metrics_port and self.metrics_server is None:
+            self.metrics_server = await start_metrics_server(self.metrics_port)
         
-    async def execute_analysis(self) -> None:
+    async def run_once(self) -> None:
         start_time = time.time()
         print(f"Starting analysis at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
         try:
-            await self._analyzer.execute_analysis()
+            await self._analyzer.run_once()
         finally:
             end_time = time.time()
             duration = end_time - start_time
             print(f"Completed analysis at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             print(f"Total execution time: {duration:.2f} seconds")
-            
+            metrics.inc("run_duration_seconds_total", duration)
+            export_metrics(self.metrics_file)
 
-def process_item_worker(analyzer_class: Type[BaseAnalyzer[T]], item: T, db_params: dict[str, str]) -> None:
-    """Worker function to process a single item"""
-    async def process() -> None:
-        db = Database(**db_params)
-        await db.connect()
-            
+    async def cleanup(self) -> None:
         try:
-            analyzer = analyzer_class(db_params)
-            analyzer.db = db
-            await analyzer.process_item(item)
+            await super().cleanup()
         finally:
-            await db.close()
-
-    asyncio.run(process())
+            if self.metrics_server is not None:
+                await self.metrics_server.cleanup()
+                self.metrics_server = None
+                metrics.served = False
@@ -0,0 +1,109 @@
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Set
+
+# Public holidays with a fixed date as (month, day)
+FIXED_HOLIDAYS = [
+    (1, 1),    # New Year's Day
+    (1, 7),    # Orthodox Christmas
+    (5, 1),    # Labour Day
+    (5, 24),   # Saints Cyril and Methodius Day
+    (8, 2),    # Republic Day
+    (9, 8),    # Independence Day
+    (10, 11),  # Day of the People's Uprising
+    (10, 23),  # Day of the Macedonian Revolutionary Struggle
+    (12, 8)    # Saint Clement of Ohrid Day
+]
+
+# First day of Ramazan Bajram (Eid al-Fitr); it follows the lunar calendar and is announced yearly
+EID_AL_FITR = [
+    date(2014, 7, 28), date(2015, 7, 17), date(2016, 7, 5), date(2017, 6, 25), date(2018, 6, 15),
+    date(2019, 6, 4), date(2020, 5, 24), date(2021, 5, 13), date(2022, 5, 2), date(2023, 4, 21),
+    date(2024, 4, 10), date(2025, 3, 30), date(2026, 3, 20), date(2027, 3, 10), date(2028, 2, 27),
+    date(2029, 2, 14), date(2030, 2, 5)
+]
+
+
+def orthodox_easter(year: int) -> date:
+    """Orthodox Easter Sunday in the Gregorian calendar (valid for 1900-2099)"""
+    a, b, c = year % 4, year % 7, year % 19
+    d = (19 * c + 15) % 30
+    e = (2 * a + 4 * b - d + 34) % 7
+    month, day = divmod(d + e + 114, 31)
+    return date(year, month, day + 1) + timedelta(days=13)
+
+
+def public_holidays(year: int) -> Set[date]:
+    """Macedonian public holidays of a year, including Monday substitutes for holidays on a Sunday"""
+    holidays = {date(year, month, day) for month, day in FIXED_HOLIDAYS}
+    holidays.add(orthodox_easter(year) + timedelta(days=1))  # Easter Monday
+    holidays.update(day for day in EID_AL_FITR if day.year == year)
+    holidays.update(day + timedelta(days=1) for day in list(holidays) if day.weekday() == 6)
+    return holidays
+
+
+class TradingCalendar:
+    """Trading days of the Macedonian Stock Exchange"""
+    def __init__(self, no_trade_days: Iterable[date] = ()) -> None:
+        self.no_trade_days: Set[date] = set(no_trade_days)
+        self.traded_days: Set[date] = set()
+        self.holidays: dict[int, Set[date]] = {}
+
+    def learn(self, traded_days: Iterable[date]) -> None:
+        """Mark weekdays without stock history between the first and last traded day as no-trade days"""
+        traded = set(traded_days)
+
+        if not traded:
+            return
+
+        self.traded_days.update(traded)
+        day, last = min(traded), max(traded)
+
+        while day < last:
+            if day.weekday() < 5 and day not in traded:
+                self.no_trade_days.add(day)
+            day += timedelta(days=1)
+
+    def is_trading_day(self, day: date) -> bool:
+        if day in self.traded_days:  # Observed trading overrides the holiday table
+            return True
+
+        if day.weekday() >= 5 or day in self.no_trade_days:
+            return False
+
+        if day.year not in self.holidays:
+            self.holidays[day.year] = public_holidays(day.year)
+
+        return day not in self.holidays[day.year]
+
+    def previous_trading_day(self, day: date) -> date:
+        """Latest trading day on or before the given day"""
+        while not self.is_trading_day(day):
+            day -= timedelta(days=1)
+
+        return day
+
+    def latest_trading_day(self, today: Optional[date] = None) -> date:
+        return self.previous_trading_day(today or datetime.now().date())
+
+    def trading_days(self, start: date, end: date) -> List[date]:
+        """Trading days between start and end, both inclusive"""
+        days = []
+
+        while start <= end:
+            if self.is_trading_day(start):
+                days.append(start)
+            start += timedelta(days=1)
+
+        return days
+
+    def next_trading_days(self, after: date, count: int) -> List[date]:
+        """The given number of trading days following a day"""
+        days = []
+
+        while len(days) < count:
+            after += timedelta(days=1)
+
+            if self.is_trading_day(after):
+                days.append(after)
+
+        return days
@@ -0,0 +1,107 @@
+import asyncio
+import multiprocessing
+from queue import Empty
+from typing import List, Optional, Type
+from .base_analyzer import BaseAnalyzer, T
+from .concurrency import process_concurrently
+from .database import Database
+from .metrics import Snapshot, metrics
+
+# Type aliases
+BatchResult = tuple[int, int]  # (processed, failed)
+WorkerResult = tuple[int, int, Snapshot]  # (processed, failed, metrics recorded while processing the batch)
+
+
+class WorkerPool:
+    """Long-lived worker processes, each owning one event loop and one small database pool"""
+    
+    def __init__(self, analyzer_class: Type[BaseAnalyzer[T]], db_params: dict[str, str],
+                 process_count: int, concurrency: int) -> None:
+        """Initialize the pool without starting any process"""
+        self.analyzer_class = analyzer_class
+        self.db_params = db_params
+        self.process_count = process_count
+        self.concurrency = concurrency
+        self.tasks: multiprocessing.Queue = multiprocessing.Queue()
+        self.results: multiprocessing.Queue = multiprocessing.Queue()
+        self.processes: List[multiprocessing.Process] = []
+
+    def start(self) -> None:
+        """Start the worker processes"""
+        for _ in range(self.process_count):
+            process = multiprocessing.Process(
+                target=worker_main,
+                args=(self.analyzer_class, self.db_params, self.concurrency, self.tasks, self.results)
+            )
+            process.start()
+            self.processes.append(process)
+
+    async def map(self, items: List[T], batch_size: int) -> BatchResult:
+        """Hand items to the workers in batches and wait until all of them are processed"""
+        batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+        for batch in batches:
+            self.tasks.put(batch)
+
+        processed, failed = 0, 0
+
+        for _ in batches:
+            batch_processed, batch_failed, snapshot = await self._next_result()
+            metrics.merge(snapshot)
+            processed += batch_processed
+            failed += batch_failed
+
+        return processed, failed
+
+    async def _next_result(self) -> WorkerResult:
+        """Wait for the next batch result, failing if a worker died"""
+        while True:
+            try:
+                return await asyncio.to_thread(self.results.get, True, 1)
+            except Empty:
+                if not all(process.is_alive() for process in self.processes):
+                    raise RuntimeError("A worker process exited unexpectedly")
+
+    def stop(self) -> None:
+        """Ask the workers to finish and wait for them to exit"""
+        for process in self.processes:
+            if process.is_alive():
+                self.tasks.put(None)
+
+        for process in self.processes:
+            process.join(timeout=30)
+
+            if process.is_alive():
+                process.terminate()
+
+        self.processes = []
+
+
+def worker_main(analyzer_class: Type[BaseAnalyzer[T]], db_params: dict[str, str], concurrency: int,
+                tasks: multiprocessing.Queue, results: multiprocessing.Queue) -> None:
+    """Entry point of a worker process"""
+    asyncio.run(run_worker(analyzer_class, db_params, concurrency, tasks, results))
+
+
+async def run_worker(analyzer_class: Type[BaseAnalyzer[T]], db_params: dict[str, str], concurrency: int,
+                     tasks: multiprocessing.Queue, results: multiprocessing.Queue) -> None:
+    """Process batches from the task queue until a stop sentinel arrives"""
+    metrics.drain()  # Forked workers inherit what the parent recorded so far
+    metrics.set_labels(component=analyzer_class.__name__)
+    analyzer = analyzer_class(db_params)
+    analyzer.db = Database(**db_params, max_size=concurrency)
+    await analyzer.db.connect()
+
+    loop = asyncio.get_running_loop()
+
+    try:
+        while True:
+            batch: Optional[List[T]] = await loop.run_in_executor(None, tasks.get)
+
+            if batch is None:
+                break
+
+            failed = await process_concurrently(analyzer.process_item, batch, concurrency)
+            results.put((len(batch), failed, metrics.drain()))
+    finally:
+        await analyzer.cleanup()
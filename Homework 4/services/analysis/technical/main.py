@@ -12,7 +12,10 @@ sys.path.append(parent_dir)
 load_dotenv()
 
 from shared.base_analyzer import BaseAnalyzer
+from shared.daemon import Daemon
 from shared.decorators import LoggerAnalyzer, MultiProcessAnalyzer
+from shared.metrics import metrics
+from shared.tracing import tracer
 
 # Type aliases
 IssuerStocks = Tuple[int, List[int]]  # (issuer_id, list of stock_ids)
@@ -53,6 +56,7 @@ class TechnicalAnalyzer(BaseAnalyzer[IssuerStocks]):
     async def process_item(self, item: IssuerStocks) -> None:
         """Process technical analysis for a single issuer"""
         issuer_id, stock_ids = item
+        tracer.annotate(issuer_id=issuer_id)
         
         # Collect stock data
         stocks_data: List[StockData] = []
@@ -66,6 +70,8 @@ class TechnicalAnalyzer(BaseAnalyzer[IssuerStocks]):
                 'volume': float(record['volume'])
             } for record in records])
         
+        tracer.annotate(rows=len(stocks_data))
+
         # Check if we have enough data
         if len(stocks_data) < 14:  # Minimum required for most indicators
             print(f"Not enough data found for issuer {issuer_id}")
@@ -77,7 +83,8 @@ class TechnicalAnalyzer(BaseAnalyzer[IssuerStocks]):
         df.set_index('date', inplace=True)
         
         # Calculate indicators and store results
-        results = utils.calculate_indicators(df)
+        with metrics.time("compute", operation="indicators"):
+            results = utils.calculate_indicators(df)
         await self.db.store_technical_analysis(
             issuer_id, 
             results['moving_averages'], 
@@ -97,4 +104,8 @@ if __name__ == "__main__":
     technical_analyzer = TechnicalAnalyzer(db_params)
     technical_analyzer = MultiProcessAnalyzer(technical_analyzer)
     technical_analyzer = LoggerAnalyzer(technical_analyzer)
-    asyncio.run(technical_analyzer.execute_analysis())
+
+    if "--daemon" in sys.argv:
+        asyncio.run(Daemon.from_env("technical-analyzer", technical_analyzer.connect_db, technical_analyzer.run_once, technical_analyzer.cleanup).serve())
+    else:
+        asyncio.run(technical_analyzer.execute_analysis())
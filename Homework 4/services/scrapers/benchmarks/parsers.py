@@ -0,0 +1,79 @@
+import os
+import sys
+import glob
+import time
+import argparse
+from typing import Callable, Dict, List, Tuple
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from shared.parsers import PARSERS, HtmlParser
+
+# Type aliases
+Extractor = Callable[[HtmlParser, str], object]
+
+
+def load_pages(pattern: str) -> List[Tuple[str, str]]:
+    """Read recorded pages matching a glob pattern as (path, html) pairs"""
+    pages = []
+
+    for path in sorted(glob.glob(pattern, recursive=True)):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            pages.append((path, f.read()))
+
+    return pages
+
+
+def benchmark(name: str, pages: List[Tuple[str, str]], extract: Extractor, repeat: int) -> bool:
+    """Time every parser backend on the pages and check that they all extract the same data"""
+    if not pages:
+        print(f"{name}: no recorded pages")
+        return True
+
+    parsers = {parser_name: parser_class() for parser_name, parser_class in PARSERS.items()}
+    timings: Dict[str, float] = {}
+    identical = True
+
+    for path, html in pages:
+        outputs = {parser_name: extract(parser, html) for parser_name, parser in parsers.items()}
+        reference = outputs["soup"]
+
+        for parser_name, output in outputs.items():
+            if output != reference:
+                identical = False
+                print(f"{name}: {parser_name} output differs from soup for {path}")
+
+    for parser_name, parser in parsers.items():
+        start = time.perf_counter()
+
+        for _ in range(repeat):
+            for _, html in pages:
+                extract(parser, html)
+
+        timings[parser_name] = time.perf_counter() - start
+
+    parsed = len(pages) * repeat
+    print(f"{name}: {len(pages)} pages x {repeat} repeats, outputs {'identical' if identical else 'DIFFERENT'}")
+
+    for parser_name, duration in sorted(timings.items(), key=lambda timing: timing[1]):
+        print(
+            f"  {parser_name:>5}: {duration:.3f}s total, {duration / parsed * 1000:.2f} ms/page, "
+            f"{timings['soup'] / duration:.1f}x soup"
+        )
+
+    return identical
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare HTML parser backends on recorded MSE pages")
+    parser.add_argument("--tables", default="fixtures/recorded/**/symbolhistory*.html",
+                        help="glob of recorded symbolhistory pages")
+    parser.add_argument("--articles", default="fixtures/recorded/**/news*.html",
+                        help="glob of recorded news article pages")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tables_ok = benchmark("table_rows", load_pages(args.tables), lambda p, html: p.table_rows(html), args.repeat)
+    articles_ok = benchmark("news_article", load_pages(args.articles), lambda p, html: p.news_article(html), args.repeat)
+    sys.exit(0 if tables_ok and articles_ok else 1)
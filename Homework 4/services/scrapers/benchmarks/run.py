@@ -0,0 +1,268 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import resource
+import importlib
+import subprocess
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+import asyncpg
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from shared.base_scraper import BaseScraper
+from shared.decorators import MultiProcessScraper, ConcurrentScraper
+from fixtures.store import FixtureStore
+from fixtures.server import FixtureServer, start_server
+from fixtures.record import DEFAULT_OUTPUT
+
+# Type aliases
+Result = Dict[str, Any]  # One scraper run under one decorator stack
+
+# Scraper directory -> scraper class defined in its main.py, in pipeline order
+SCRAPERS = {
+    "issuers": "IssuerScraper",
+    "news": "NewsScraper",
+    "issuer_news": "IssuerNewsScraper"
+}
+
+# Decorator stacks the scrapers are measured under
+STACKS: Dict[str, Callable[[BaseScraper], BaseScraper]] = {
+    "plain": lambda scraper: scraper,
+    "multiprocess": MultiProcessScraper,
+    "concurrent": ConcurrentScraper
+}
+
+# Tables whose growth is counted as stored rows
+COUNTED_TABLES = ["Company", "Company_mk", "Issuer", "StockHistory", "News", "issuer_news"]
+
+# Metrics where a higher value is better, used when comparing against a baseline
+HIGHER_IS_BETTER = {"pages_per_s", "rows_per_s", "db_inserts_per_s"}
+
+
+def db_params() -> Dict[str, str]:
+    return {
+        "host": os.getenv("DB_HOST", "localhost"),
+        "database": os.getenv("DB_DATABASE", "postgres"),
+        "user": os.getenv("DB_USER", "postgres"),
+        "password": os.getenv("DB_PASSWORD", "postgres")
+    }
+
+
+def peak_rss_mb(who: int) -> float:
+    """Peak resident set size in MiB (ru_maxrss is reported in KiB on Linux)"""
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+async def run_child(scraper_name: str, stack: str, result_path: str) -> None:
+    """Run one scraper in this process and write its timings and memory use to a file"""
+    sys.path.insert(0, os.path.join(parent_dir, scraper_name))
+    scraper_main = importlib.import_module("main")
+    scraper = STACKS[stack](getattr(scraper_main, SCRAPERS[scraper_name])(db_params()))
+
+    start = time.perf_counter()
+    await scraper.execute_scraping()
+    run_time = time.perf_counter() - start
+
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "run_time_s": run_time,
+            "peak_rss_mb": peak_rss_mb(resource.RUSAGE_SELF),
+            "worker_peak_rss_mb": peak_rss_mb(resource.RUSAGE_CHILDREN)
+        }, f)
+
+
+async def table_counts(conn: asyncpg.Connection) -> Dict[str, int]:
+    counts = {}
+
+    for table in COUNTED_TABLES:
+        if await conn.fetchval("SELECT to_regclass($1)", table.lower()):
+            counts[table] = await conn.fetchval(f"SELECT COUNT(*) FROM {table}")
+        else:
+            counts[table] = 0
+
+    return counts
+
+
+async def tuples_inserted(conn: asyncpg.Connection) -> int:
+    """Rows inserted into the benchmark database, including COPY staging tables"""
+    await conn.execute("SELECT pg_stat_clear_snapshot()")
+    return await conn.fetchval("SELECT tup_inserted FROM pg_stat_database WHERE datname = current_database()")
+
+
+async def run_scenario(server: FixtureServer, base_url: str, database: str, scraper_name: str, stack: str,
+                       log_path: str) -> Result:
+    """Run one scraper under one decorator stack in a fresh interpreter and collect its throughput"""
+    params = {**db_params(), "database": database}
+    conn = await asyncpg.connect(**params)
+    result_path = f"{log_path}.json"
+
+    try:
+        counts_before = await table_counts(conn)
+        inserted_before = await tuples_inserted(conn)
+        server.clear()
+
+        env = {**os.environ, "MSE_BASE_URL": base_url, "SEINET_API_URL": base_url, "DB_DATABASE": database}
+        env.pop("HTTP_CACHE_DIR", None)
+
+        with open(log_path, "w", encoding="utf-8") as log:
+            start = time.perf_counter()
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, os.path.abspath(__file__), "--child", scraper_name, "--stack", stack,
+                "--result", result_path, env=env, stdout=log, stderr=subprocess.STDOUT
+            )
+            return_code = await process.wait()
+            wall_time = time.perf_counter() - start
+
+        await asyncio.sleep(0.5)  # Let the closed backends flush their statistics
+        counts_after = await table_counts(conn)
+        inserted = await tuples_inserted(conn) - inserted_before
+    finally:
+        await conn.close()
+
+    child: Dict[str, float] = {}
+
+    if os.path.exists(result_path):
+        with open(result_path, "r", encoding="utf-8") as f:
+            child = json.load(f)
+        os.remove(result_path)
+
+    requests = server.snapshot()
+    rows = {table: counts_after[table] - counts_before[table] for table in COUNTED_TABLES}
+    stored = sum(rows.values())
+
+    return {
+        "scraper": scraper_name,
+        "stack": stack,
+        "ok": return_code == 0,
+        "wall_time_s": wall_time,
+        "run_time_s": child.get("run_time_s"),
+        "pages": requests["total_requests"],
+        "pages_per_s": requests["total_requests"] / wall_time,
+        "bytes_received": requests["bytes_sent"],
+        "requests": requests["requests"],
+        "rows": rows,
+        "rows_per_s": stored / wall_time,
+        "db_inserts": inserted,
+        "db_inserts_per_s": inserted / wall_time,
+        "peak_rss_mb": child.get("peak_rss_mb"),
+        "worker_peak_rss_mb": child.get("worker_peak_rss_mb"),
+        "log": log_path
+    }
+
+
+async def run_suite(args: argparse.Namespace) -> List[Result]:
+    """Run every requested scraper, in pipeline order, against a fresh database per decorator stack"""
+    store = FixtureStore(args.fixtures).load()
+    server = FixtureServer(store, args.latency, args.jitter, args.error_rate, seed=args.seed)
+    runner = await start_server(server, "127.0.0.1", args.port)
+    base_url = f"http://127.0.0.1:{args.port}"
+    os.makedirs(args.logs, exist_ok=True)
+    results: List[Result] = []
+
+    try:
+        for stack in args.stacks:
+            database = f"scraper_bench_{stack}_{os.getpid()}"
+            admin = await asyncpg.connect(**db_params())
+            await admin.execute(f'DROP DATABASE IF EXISTS "{database}"')
+            await admin.execute(f'CREATE DATABASE "{database}"')
+
+            try:
+                for scraper_name in [name for name in SCRAPERS if name in args.scrapers]:
+                    log_path = os.path.join(args.logs, f"{stack}-{scraper_name}.log")
+                    result = await run_scenario(server, base_url, database, scraper_name, stack, log_path)
+                    results.append(result)
+                    print(
+                        f"{stack:>12} {scraper_name:<12} {result['wall_time_s']:7.2f}s "
+                        f"{result['pages_per_s']:8.1f} pages/s {result['rows_per_s']:9.1f} rows/s "
+                        f"{result['db_inserts_per_s']:9.1f} inserts/s "
+                        f"{result['peak_rss_mb'] or 0:7.1f} MiB{'' if result['ok'] else '  FAILED'}",
+                        file=sys.stderr
+                    )
+            finally:
+                if not args.keep_db:
+                    await admin.execute(f'DROP DATABASE IF EXISTS "{database}" WITH (FORCE)')
+                await admin.close()
+    finally:
+        await runner.cleanup()
+
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=parent_dir).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: Dict[str, Any], baseline_path: str) -> None:
+    """Print the relative change of every metric against a previous report"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(result["scraper"], result["stack"]): result for result in json.load(f)["results"]}
+
+    for result in report["results"]:
+        previous = baseline.get((result["scraper"], result["stack"]))
+
+        if previous is None:
+            continue
+
+        changes = []
+
+        for metric in ("wall_time_s", "pages_per_s", "rows_per_s", "db_inserts_per_s", "peak_rss_mb"):
+            if result.get(metric) and previous.get(metric):
+                change = (result[metric] - previous[metric]) / previous[metric] * 100
+                better = change > 0 if metric in HIGHER_IS_BETTER else change < 0
+                changes.append(f"{metric} {change:+.1f}%{'' if better or abs(change) < 5 else ' (worse)'}")
+
+        print(f"{result['stack']:>12} {result['scraper']:<12} {', '.join(changes)}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure scraper throughput against the fixture server")
+    parser.add_argument("--fixtures", default=DEFAULT_OUTPUT)
+    parser.add_argument("--scrapers", nargs="+", choices=list(SCRAPERS), default=list(SCRAPERS))
+    parser.add_argument("--stacks", nargs="+", choices=list(STACKS), default=list(STACKS))
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every fixture response")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--logs", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs"))
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="JSON report of an earlier run to compare against")
+    parser.add_argument("--keep-db", action="store_true", help="keep the benchmark databases for inspection")
+    parser.add_argument("--child", choices=list(SCRAPERS), help=argparse.SUPPRESS)
+    parser.add_argument("--stack", choices=list(STACKS), help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(run_child(args.child, args.stack, args.result))
+        sys.exit(0)
+
+    report = {
+        "commit": git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "error_rate": args.error_rate,
+            "cpu_count": os.cpu_count()
+        },
+        "results": asyncio.run(run_suite(args))
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+    if args.compare:
+        compare(report, args.compare)
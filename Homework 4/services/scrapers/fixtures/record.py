@@ -0,0 +1,196 @@
+import os
+import re
+import json
+import sys
+import asyncio
+import argparse
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from bs4 import BeautifulSoup, SoupStrainer
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from shared.http import HttpResponse, HttpSession
+from shared.parsers import get_parser
+from shared.concurrency import process_concurrently
+from shared.urls import MSE_BASE_URL, SEINET_API_URL
+from fixtures.store import FixtureStore
+
+# Recordings land next to this script unless told otherwise
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recorded")
+
+# Same listing requests as issuer_news/utils.py makes, so that its page walk replays against the recording
+DOCUMENTS_PAGE_SIZE = 100
+DOCUMENTS_TOTAL_KEYS = ("totalCount", "total", "totalItems", "totalRecords")
+
+
+def json_bytes(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def slug(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]+", "-", value).strip("-")[:120]
+
+
+class Recorder:
+    """Captures upstream responses for every page type the scrapers request"""
+    def __init__(self, http: HttpSession, store: FixtureStore, years: int, documents: int, attachments: bool) -> None:
+        self.http = http
+        self.store = store
+        self.years = years
+        self.documents = documents
+        self.attachments = attachments
+
+    async def get(self, url: str, name: str) -> Optional[HttpResponse]:
+        response = await self.http.get(url)
+
+        if response.status != 200:
+            print(f"Skipping {url}: status {response.status}")
+            return None
+
+        self.store.record("GET", url, name, response.status, response.headers.get("Content-Type", ""), response.body)
+        return response
+
+    async def record_schedule(self) -> List[str]:
+        """Record the current schedule and return the issuer codes listed on it"""
+        response = await self.get(f"{MSE_BASE_URL}/en/stats/current-schedule", "mse/current-schedule.html")
+        rows = get_parser().table_rows(response.text()) if response else []
+        return [row[0] for row in rows if row and not any(char.isdigit() for char in row[0])]
+
+    async def record_issuer(self, code: str) -> None:
+        """Record the company pages, the stock history and the SEINet documents of an issuer"""
+        await self.get(f"{MSE_BASE_URL}/mk/symbol/{code}", f"mse/symbol-mk-{slug(code)}.html")
+        response = await self.get(f"{MSE_BASE_URL}/en/symbol/{code}", f"mse/symbol-en-{slug(code)}.html")
+        to_date = datetime.now().date()
+        pages: List[str] = []
+
+        for _ in range(self.years):
+            from_date = to_date - timedelta(days=364)
+            url = (f"{MSE_BASE_URL}/mk/stats/symbolhistory/{code}"
+                   f"?FromDate={from_date:%d,%m,%Y}&ToDate={to_date:%d,%m,%Y}")
+            name = f"mse/symbolhistory-{slug(code)}-{from_date:%Y%m%d}.html"
+
+            if await self.get(url, name):
+                pages.append(name)
+
+            to_date = from_date - timedelta(days=1)
+
+        self.store.symbol_history[code] = pages
+
+        if response is None:
+            return
+
+        soup = BeautifulSoup(response.text(), "lxml", parse_only=SoupStrainer("div"))
+        link = soup.select_one("a[href^='https://seinet.com.mk/search/']")
+
+        if link is not None:
+            await self.record_documents(int(link.get("href").split("/")[-1]))
+
+    async def record_documents(self, issuer_id: int) -> None:
+        """Record every page of an issuer's SEINet document listing and the newest documents"""
+        url = f"{SEINET_API_URL}/public/documents"
+        date_from = datetime.now() - timedelta(days=365 * self.years)
+        date_to = datetime.now()
+        documents: List[Dict[str, Any]] = []
+        previous: Optional[List[Dict[str, Any]]] = None
+        page_size = 0
+        page = 1
+
+        while True:
+            response = await self.http.post(url, json={
+                "channelId": 1,
+                "dateFrom": date_from.strftime("%Y-%m-%dT%H:%M:%S"),
+                "dateTo": date_to.strftime("%Y-%m-%dT%H:%M:%S"),
+                "isPushRequest": "false",
+                "issuerId": issuer_id,
+                "languageId": 2,
+                "page": page,
+                "pageSize": DOCUMENTS_PAGE_SIZE
+            })
+
+            body = response.json() if response.status == 200 else {}
+            data = body.get("data")
+            total = next((body[key] for key in DOCUMENTS_TOTAL_KEYS if isinstance(body.get(key), int)), None)
+
+            # An API ignoring the page number would serve the first page forever
+            if not data or data == previous:
+                break
+
+            previous = data
+            documents.extend(data)
+            page_size = max(page_size, len(data))
+            page += 1
+
+            if total is not None and len(documents) >= total:
+                break
+
+        name = f"seinet/documents-{issuer_id}.json"
+        self.store.write(name, json_bytes({"data": documents, "page_size": page_size}))
+        self.store.documents[str(issuer_id)] = name
+
+        for document in documents[:self.documents]:
+            await self.record_document(document["documentId"])
+
+    async def record_document(self, document_id: int) -> None:
+        response = await self.get(f"{SEINET_API_URL}/public/documents/single/{document_id}",
+                                  f"seinet/document-{document_id}.json")
+
+        if response is None or not self.attachments:
+            return
+
+        for attachment in (response.json().get("data") or {}).get("attachments") or []:
+            if "application/pdf" in attachment["attachmentType"]["mimeType"]:
+                attachment_id = attachment["attachmentId"]
+                await self.get(f"{SEINET_API_URL}/public/documents/attachment/{attachment_id}",
+                               f"seinet/attachment-{attachment_id}.pdf")
+
+    async def record_news(self, pages: int) -> None:
+        """Record the news listing pages and the English and Macedonian version of every article"""
+        links: List[str] = []
+
+        for i in range(1, pages + 1):
+            response = await self.get(f"{MSE_BASE_URL}/en/news/latest/{i}", f"mse/latest-{i}.html")
+
+            if response is None:
+                continue
+
+            soup = BeautifulSoup(response.text(), "lxml", parse_only=SoupStrainer("div", {"id": "news-content"}))
+            links.extend(link.get("href") for link in soup.select("a") if link.select_one("b"))
+
+        async def record_article(link: str) -> None:
+            for locale_link in (link, link.replace("en/", "mk/")):
+                await self.get(f"{MSE_BASE_URL}{locale_link}", f"mse/news-{slug(locale_link)}.html")
+
+        await process_concurrently(record_article, links, 8)
+
+
+async def record(args: argparse.Namespace) -> None:
+    store = FixtureStore(args.output).load()
+    http = HttpSession(cache_dir=args.cache_dir)
+    recorder = Recorder(http, store, args.years, args.documents, args.attachments)
+
+    try:
+        scheduled = await recorder.record_schedule()
+        codes = args.codes or scheduled[:args.issuers]
+        print(f"Recording {len(codes)} issuers: {', '.join(codes)}")
+        failed = await process_concurrently(recorder.record_issuer, codes, args.concurrency)
+        await recorder.record_news(args.news_pages)
+        print(f"Recorded {len(store.exact)} responses into {args.output} ({failed} issuers failed)")
+    finally:
+        store.save()
+        await http.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record mse.mk and SEINet responses for the fixture server")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--codes", nargs="*", help="issuer codes to record, defaults to the current schedule")
+    parser.add_argument("--issuers", type=int, default=10, help="issuers taken from the current schedule")
+    parser.add_argument("--years", type=int, default=2, help="years of stock history and documents")
+    parser.add_argument("--documents", type=int, default=20, help="newest SEINet documents per issuer")
+    parser.add_argument("--attachments", action="store_true", help="also record PDF attachments")
+    parser.add_argument("--news-pages", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--cache-dir", help="HTTP cache to record through")
+    asyncio.run(record(parser.parse_args()))
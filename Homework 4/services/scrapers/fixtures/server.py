@@ -0,0 +1,208 @@
+import os
+import sys
+import json
+import random
+import asyncio
+import argparse
+from html import escape
+from collections import Counter
+from datetime import datetime, date
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import lxml.html
+from aiohttp import web
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from shared.parsers import get_parser
+from fixtures.store import FixtureStore
+from fixtures.record import DEFAULT_OUTPUT
+
+# Type aliases
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+StockRow = List[str]  # Cells of a symbolhistory row, the date first
+
+
+def parse_query_date(value: Optional[str]) -> Optional[date]:
+    """Parse the dd,mm,yyyy dates of symbolhistory queries"""
+    return datetime.strptime(value, "%d,%m,%Y").date() if value else None
+
+
+class FixtureServer:
+    """Replays recorded mse.mk and SEINet responses with configurable latency and injected errors"""
+    def __init__(self, store: FixtureStore, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, seed: Optional[int] = None) -> None:
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.requests: Counter = Counter()  # Route name -> requests served
+        self.errors: Counter = Counter()  # Route name -> injected errors
+        self.bytes_sent = 0
+        self.stock_rows: Dict[str, List[StockRow]] = {}
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self.simulate])
+        app.router.add_get("/_fixtures/stats", self.stats)
+        app.router.add_post("/_fixtures/reset", self.reset)
+        app.router.add_get("/{locale}/stats/current-schedule", self.schedule, name="schedule")
+        app.router.add_get("/{locale}/stats/symbolhistory/{code}", self.symbol_history, name="symbolhistory")
+        app.router.add_post("/public/documents", self.documents, name="documents")
+        app.router.add_get("/{path:.*}", self.replay, name="replay")
+        return app
+
+    @web.middleware
+    async def simulate(self, request: web.Request, handler: Handler) -> web.StreamResponse:
+        """Delay every upstream request, fail a share of them and count what was served"""
+        if request.path.startswith("/_fixtures/"):
+            return await handler(request)
+
+        route = request.match_info.route.name or "replay"
+        self.requests[route] += 1
+        delay = self.latency + self.random.uniform(-self.jitter, self.jitter)
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self.random.random() < self.error_rate:
+            self.errors[route] += 1
+            return web.Response(status=self.error_status, text="Injected error")
+
+        response = await handler(request)
+
+        if isinstance(response, web.Response) and response.body is not None:
+            self.bytes_sent += len(response.body)
+
+        return response
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": dict(self.requests),
+            "errors": dict(self.errors),
+            "total_requests": sum(self.requests.values()),
+            "bytes_sent": self.bytes_sent
+        }
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.snapshot())
+
+    def clear(self) -> None:
+        """Forget the requests served so far"""
+        self.requests.clear()
+        self.errors.clear()
+        self.bytes_sent = 0
+
+    async def reset(self, request: web.Request) -> web.Response:
+        self.clear()
+        return web.json_response({"reset": True})
+
+    async def replay(self, request: web.Request) -> web.Response:
+        """Serve the response recorded for exactly this path and query"""
+        recording = self.store.lookup(request.method, str(request.rel_url))
+
+        if recording is None:
+            return web.Response(status=404, text="Not recorded")
+
+        return web.Response(body=self.store.read(recording["file"]), status=recording["status"],
+                            headers={"Content-Type": recording["content_type"] or "application/octet-stream"})
+
+    async def schedule(self, request: web.Request) -> web.Response:
+        """Serve the recorded schedule, listing only the issuers whose history was recorded"""
+        recording = self.store.lookup(request.method, str(request.rel_url))
+
+        if recording is None:
+            return web.Response(status=404, text="Not recorded")
+
+        document = lxml.html.document_fromstring(self.store.read(recording["file"]))
+
+        for row in document.xpath("//tbody//tr"):
+            cells = row.xpath(".//td")
+            code = cells[0].text_content().strip() if cells else ""
+
+            if self.store.symbol_history and code not in self.store.symbol_history:
+                row.getparent().remove(row)
+
+        return web.Response(body=lxml.html.tostring(document, encoding="utf-8"),
+                            content_type="text/html", charset="utf-8")
+
+    def rows(self, code: str) -> List[StockRow]:
+        """Recorded stock history of an issuer without duplicate dates, newest first"""
+        if code not in self.stock_rows:
+            rows: Dict[date, StockRow] = {}
+
+            for name in self.store.symbol_history.get(code, []):
+                html = self.store.read(name).decode("utf-8", errors="replace")
+
+                for row in get_parser().table_rows(html):
+                    if row and row[0]:
+                        rows.setdefault(datetime.strptime(row[0], "%d.%m.%Y").date(), row)
+
+            self.stock_rows[code] = [rows[row_date] for row_date in sorted(rows, reverse=True)]
+
+        return self.stock_rows[code]
+
+    async def symbol_history(self, request: web.Request) -> web.Response:
+        """Render the recorded rows that fall into the requested date range, as the site would"""
+        try:
+            from_date = parse_query_date(request.query.get("FromDate"))
+            to_date = parse_query_date(request.query.get("ToDate"))
+        except ValueError:
+            return web.Response(status=400, text="Invalid date range")
+
+        rows = [
+            row for row in self.rows(request.match_info["code"])
+            if (from_date is None or datetime.strptime(row[0], "%d.%m.%Y").date() >= from_date)
+            and (to_date is None or datetime.strptime(row[0], "%d.%m.%Y").date() <= to_date)
+        ]
+
+        body = "".join("<tr>" + "".join(f"<td>{escape(cell)}</td>" for cell in row) + "</tr>" for row in rows)
+        html = f"<html><body><table id=\"resultsTable\"><tbody>{body}</tbody></table></body></html>"
+        return web.Response(text=html, content_type="text/html", charset="utf-8")
+
+    async def documents(self, request: web.Request) -> web.Response:
+        """Page through the recorded SEINet documents of an issuer published in the requested range"""
+        payload: Dict[str, Any] = await request.json()
+        name = self.store.documents.get(str(payload.get("issuerId")))
+
+        if name is None:
+            return web.json_response({"data": []})
+
+        listing = json.loads(self.store.read(name))
+        date_from = str(payload.get("dateFrom") or "")[:19]
+        date_to = str(payload.get("dateTo") or "9999")[:19]
+        documents = [
+            document for document in listing["data"]
+            if date_from <= str(document.get("publishedDate", ""))[:19] <= date_to
+        ]
+
+        page_size = int(payload.get("pageSize") or listing.get("page_size") or len(documents) or 1)
+        page = max(1, int(payload.get("page") or 1))
+        return web.json_response({"data": documents[(page - 1) * page_size:page * page_size]})
+
+
+async def start_server(server: FixtureServer, host: str, port: int) -> web.AppRunner:
+    """Serve the fixtures from inside an already running event loop"""
+    runner = web.AppRunner(server.app())
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded mse.mk and SEINet responses")
+    parser.add_argument("--fixtures", default=DEFAULT_OUTPUT)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="maximum deviation from the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    store = FixtureStore(args.fixtures).load()
+    server = FixtureServer(store, args.latency, args.jitter, args.error_rate, args.error_status, args.seed)
+    print(f"Point MSE_BASE_URL and SEINET_API_URL at http://{args.host}:{args.port}")
+    web.run_app(server.app(), host=args.host, port=args.port)
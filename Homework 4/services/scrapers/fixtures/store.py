@@ -0,0 +1,66 @@
+import os
+import json
+from urllib.parse import urlsplit
+from typing import Any, Dict, List, Optional
+
+# Type aliases
+RequestKey = str  # "METHOD /path?query"
+Recording = Dict[str, Any]  # {"file", "status", "content_type"}
+
+
+def request_key(method: str, url: str) -> RequestKey:
+    """Key of a recorded response, independent of the host it was recorded from"""
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    return f"{method.upper()} {path}"
+
+
+class FixtureStore:
+    """Directory of recorded upstream responses and the index the replay server looks them up in"""
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        self.exact: Dict[RequestKey, Recording] = {}
+        self.symbol_history: Dict[str, List[str]] = {}  # Issuer code -> recorded symbolhistory pages
+        self.documents: Dict[str, str] = {}  # SEINet issuer id -> recorded document listing
+
+    def load(self) -> "FixtureStore":
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+
+            self.exact = index.get("exact", {})
+            self.symbol_history = index.get("symbol_history", {})
+            self.documents = index.get("documents", {})
+
+        return self
+
+    def save(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        index = {"exact": self.exact, "symbol_history": self.symbol_history, "documents": self.documents}
+
+        with open(self.index_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(self.index_path + ".tmp", self.index_path)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def write(self, name: str, body: bytes) -> None:
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "wb") as f:
+            f.write(body)
+
+    def read(self, name: str) -> bytes:
+        with open(self.path(name), "rb") as f:
+            return f.read()
+
+    def record(self, method: str, url: str, name: str, status: int, content_type: str, body: bytes) -> None:
+        """Store a response that is replayed for exactly the same method, path and query"""
+        self.write(name, body)
+        self.exact[request_key(method, url)] = {"file": name, "status": status, "content_type": content_type}
+
+    def lookup(self, method: str, url: str) -> Optional[Recording]:
+        return self.exact.get(request_key(method, url))
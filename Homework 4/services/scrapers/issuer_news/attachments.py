@@ -0,0 +1,95 @@
+import os
+import signal
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+from PyPDF2 import PdfReader
+from shared.metrics import metrics
+
+
+def extract_text(path: str, max_pages: int, timeout: float) -> List[str]:
+    """Non-empty text lines of the first max_pages pages of a PDF, run inside an extractor process"""
+    def expire(signum: int, frame: object) -> None:
+        raise TimeoutError(f"Text extraction took longer than {timeout} seconds")
+
+    # Pool tasks run on the main thread of the worker, so an interval timer can interrupt a runaway document
+    signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    try:
+        pdf = PdfReader(path)
+        contents: List[str] = []
+
+        for index in range(min(len(pdf.pages), max_pages)):
+            text = pdf.pages[index].extract_text() or ""
+            contents.extend(line.strip() for line in text.split("\n") if line.strip())
+
+        return contents
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class AttachmentExtractor:
+    """Dedicated process pool that extracts PDF text off the event loop, with per-document limits"""
+    def __init__(self, processes: Optional[int] = None, max_bytes: int = 20 * 1024 * 1024, max_pages: int = 50,
+                 timeout: float = 30) -> None:
+        self.processes = processes
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.executor: Optional[ProcessPoolExecutor] = None
+        # Documents are only handed over when a worker is free, so the deadline below never counts queueing time
+        self.slots = asyncio.Semaphore(processes or os.cpu_count() or 1)
+
+    async def extract(self, path: str) -> List[str]:
+        """Text lines of a downloaded PDF; other downloads and articles keep running meanwhile"""
+        loop = asyncio.get_running_loop()
+        retried = False
+
+        async with self.slots:
+            with metrics.time("parse", operation="pdf"):
+                while True:
+                    if self.executor is None:
+                        # Spawned rather than forked, the event loop process runs resolver and executor threads
+                        context = multiprocessing.get_context("spawn")
+                        self.executor = ProcessPoolExecutor(self.processes, mp_context=context)
+
+                    executor = self.executor
+                    future = loop.run_in_executor(executor, extract_text, path, self.max_pages, self.timeout)
+
+                    try:
+                        # The timer inside the worker enforces the limit; this one catches a worker stuck in C code
+                        return await asyncio.wait_for(future, self.timeout * 2)
+                    except asyncio.TimeoutError:
+                        self.recycle(executor)
+                        raise
+                    except BrokenProcessPool:
+                        if executor is self.executor:
+                            self.recycle(executor)  # A worker died, the next document gets a new pool
+                            raise
+
+                        # Another document got the pool recycled under this one, which gets one more try on the new pool
+                        if retried:
+                            raise
+
+                        retried = True
+
+    def recycle(self, executor: ProcessPoolExecutor) -> None:
+        """Kill the workers of a pool stuck in a document, which an abandoned await would leave blocking its slot"""
+        if self.executor is executor:
+            self.executor = None
+
+        metrics.inc("attachment_pool_recycles_total")
+
+        # ProcessPoolExecutor has no public way to stop a busy worker before Python 3.14
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.kill()
+
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
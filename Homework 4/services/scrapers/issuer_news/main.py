@@ -1,20 +1,22 @@
 import os
 import sys
-import utils
 import asyncio
 from datetime import date
 from dotenv import load_dotenv
-from typing import List, Tuple, Optional
-from aiohttp import ClientSession
-from bs4 import BeautifulSoup, SoupStrainer
+from typing import Any, List, Tuple, Optional
 
 parent_dir = os.path.dirname(os.path.dirname(__file__))
 sys.path.append(parent_dir)
 
 load_dotenv()
 
+import utils
+from attachments import AttachmentExtractor
 from shared.base_scraper import BaseScraper
-from shared.decorators import MultiProcessScraper, LoggerScraper
+from shared.catalog import IssuerCatalog
+from shared.tracing import tracer
+from shared.daemon import Daemon
+from shared.decorators import ConcurrentScraper, LoggerScraper
 
 # Type aliases
 IssuerInfo = Tuple[int, int]  # (seinet_id, db_id)
@@ -22,51 +24,70 @@ NewsContent = Tuple[int, str, date, List[str]]  # (seinet_id, content, date, att
 
 
 class IssuerNewsScraper(BaseScraper[IssuerInfo, Optional[date]]):
-    def __init__(self, db_params: dict[str, str]) -> None:
-        super().__init__(db_params)
+    def __init__(self, db_params: dict[str, str], http_params: Optional[dict[str, Any]] = None) -> None:
+        super().__init__(db_params, http_params)
+        self.catalog = IssuerCatalog(self)
+        self.article_concurrency = 4  # Articles of one issuer downloaded at once
+        self.extractor = AttachmentExtractor()
         
     async def connect_db(self) -> None:
         await self.db.connect()
         await self.db.create_issuer_news_table()
+        await self.db.create_issuer_catalog_table()
 
     async def fetch_items(self) -> List[IssuerInfo]:
-        issuers = await self.db.get_issuers()
-        issuers_map: dict[str, IssuerInfo] = {}
-
-        for issuer_code, db_id in issuers:
-            url = f"https://www.mse.mk/en/symbol/{issuer_code}"
+        issuers = await self.db.get_cataloged_issuers()
+        uncataloged = [code for code, _, _, refreshed_at in issuers if refreshed_at is None]
 
-            async with ClientSession() as session:
-                async with session.get(url) as response:
-                    response_text = await response.text()
-                    soup = BeautifulSoup(response_text, "lxml", parse_only=SoupStrainer("div"))
-                    link = soup.select_one("a[href^='https://seinet.com.mk/search/']")
+        # Issuers are normally cataloged by the issuer scraper; only ones it has not reached yet are loaded here
+        if uncataloged:
+            await self.catalog.refresh(uncataloged)
+            issuers = await self.db.get_cataloged_issuers()
 
-                    if link is None:
-                        continue
-                
-                    seinet_id = int(link.get("href").split("/")[-1])
-                    issuers_map[issuer_code] = (seinet_id, db_id)
-                    
+        issuers_map: dict[int, IssuerInfo] = {
+            seinet_id: (seinet_id, db_id) for _, db_id, seinet_id, _ in issuers if seinet_id is not None
+        }
         return list(issuers_map.values())
 
+    def item_key(self, item: IssuerInfo) -> str:
+        return str(item[0])
+
     async def fetch_last_available_date(self, item: IssuerInfo) -> Optional[date]:
         _, db_id = item
         return await self.db.get_last_available_issuer_news_date(db_id)
     
     async def fill_in_missing_data(self, last_date: Optional[date], item: IssuerInfo) -> None:
         seinet_id, db_id = item
-        news_ids = await utils.fetch_news(seinet_id, last_date)
+        semaphore = asyncio.Semaphore(self.article_concurrency)
+        downloads: List[asyncio.Task] = []
+
+        async def download(news_id: int) -> None:
+            async with semaphore:
+                if result := await utils.fetch_article(self.http, news_id, self.extractor):
+                    seinet_id, content, date, attachments = result
+                    await self.db.add_issuer_news(db_id, seinet_id, content, date, attachments)
 
-        for news_id in news_ids:
-            if await self.db.get_issuer_news_id(news_id):
-                continue
+        try:
+            # Articles of a listing page download while the next pages are still being listed
+            async for news_ids in utils.iter_news(self.http, seinet_id, last_date):
+                missing = await self.db.get_missing_issuer_news_ids(news_ids)
+                downloads.extend(asyncio.create_task(download(news_id)) for news_id in missing)
+        except BaseException:
+            for task in downloads:
+                task.cancel()
+            raise
 
-            if result := await utils.fetch_article(news_id):
-                seinet_id, content, date, attachments = result
-                await self.db.add_issuer_news(db_id, seinet_id, content, date, attachments) 
+        results = await asyncio.gather(*downloads, return_exceptions=True)
+
+        if errors := [result for result in results if isinstance(result, BaseException)]:
+            raise errors[0]
                 
+    async def cleanup(self) -> None:
+        self.extractor.close()
+        await super().cleanup()
+
     async def process_item(self, item: IssuerInfo) -> None:
+        tracer.annotate(seinet_issuer=item[0], issuer_id=item[1])
         last_date = await self.fetch_last_available_date(item)
         await self.fill_in_missing_data(last_date, item)
 
@@ -78,8 +99,20 @@ if __name__ == "__main__":
         "user": os.getenv("DB_USER", "postgres"),
         "password": os.getenv("DB_PASSWORD", "postgres")
     }
+
+    http_params = {
+        "limit_per_host": int(os.getenv("HTTP_LIMIT_PER_HOST", "10")),
+        "timeout": float(os.getenv("HTTP_TIMEOUT", "60")),
+        "cache_dir": os.getenv("HTTP_CACHE_DIR"),
+        "cache_all": os.getenv("HTTP_CACHE_ALL", "false").lower() == "true",  # Record every response for offline runs
+        "offline": os.getenv("HTTP_OFFLINE", "false").lower() == "true"
+    }
     
-    scraper = IssuerNewsScraper(db_params)
-    scraper = MultiProcessScraper(scraper)  # Add multi process at the beginning of the chain
+    scraper = IssuerNewsScraper(db_params, http_params)
+    scraper = ConcurrentScraper(scraper)  # Add concurrency at the beginning of the chain
     scraper = LoggerScraper(scraper)  # Add logger at the end of the chain
-    asyncio.run(scraper.execute_scraping())
\ No newline at end of file
+
+    if "--daemon" in sys.argv:
+        asyncio.run(Daemon.from_env("issuer-news-scraper", scraper.connect, scraper.run_once, scraper.cleanup).serve())
+    else:
+        asyncio.run(scraper.execute_scraping())
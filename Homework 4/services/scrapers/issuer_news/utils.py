@@ -1,80 +1,157 @@
-import requests
-from io import BytesIO
-from PyPDF2 import PdfReader
-from typing import List, Tuple, Optional
-from aiohttp import ClientSession
+import asyncio
+import tempfile
+from collections import deque
+from typing import AsyncIterator, Deque, List, Tuple, Optional
 from datetime import datetime, timedelta, date
+from shared.http import HttpSession
+from shared.metrics import metrics
+from shared.retry import CacheMissError, HttpError
+from shared.urls import SEINET_API_URL
+from attachments import AttachmentExtractor
 
 # Type aliases
 NewsID = int
 NewsContent = Tuple[int, str, date, List[str]]  # (seinet_id, content, date, attachments)
+NewsPage = Tuple[List[NewsID], Optional[int]]  # (document ids, total documents of the listing when the API reports it)
 
+# Documents asked for per listing page; the API may serve fewer, which iter_news detects
+PAGE_SIZE = 100
 
-async def fetch_news(issuer_id: int, last_date: Optional[date]) -> List[NewsID]:
-    if last_date is None:
-        last_date = datetime.now() - timedelta(days=365)
+# The documents endpoint is undocumented, a listing total reported under any of these keys ends the walk exactly
+TOTAL_KEYS = ("totalCount", "total", "totalItems", "totalRecords")
 
-    url = f"https://api.seinet.com.mk/public/documents"
+
+async def fetch_news_page(http: HttpSession, issuer_id: int, date_from: date, date_to: date, page: int,
+                          page_size: int) -> NewsPage:
+    url = f"{SEINET_API_URL}/public/documents"
 
     params = {
         "channelId": 1,
-        "dateFrom": last_date.strftime("%Y-%m-%dT%H:%M:%S"),
-        "dateTo": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+        "dateFrom": date_from.strftime("%Y-%m-%dT%H:%M:%S"),
+        "dateTo": date_to.strftime("%Y-%m-%dT%H:%M:%S"),
         "isPushRequest": "false",
         "issuerId": issuer_id,
         "languageId": 2,
-        "page": 1
+        "page": page,
+        "pageSize": page_size
     }
     
-    async with ClientSession() as session:
-        async with session.post(url, json=params) as response:
-            json_data = (await response.json())["data"]
-            
-            if not json_data:
-                return []
-            
-            return [item["documentId"] for item in json_data]
-
-
-async def fetch_article(news_id: int) -> Optional[NewsContent]:
-    url = f"https://api.seinet.com.mk/public/documents/single/{news_id}"
-
-    async with ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status != 200:
-                return None
-            
-            json_data = await response.json()
-
-            if not json_data["data"]:
-                return None
-
-            article = json_data["data"]
-            seinet_id = article["documentId"]
-            content = article.get("content", "")
-            date = datetime.strptime(article["publishedDate"].split(".")[0], "%Y-%m-%dT%H:%M:%S").date()
-            
-            attachment_content: List[str] = []
-            attachments = article["attachments"]
-            
-            if attachments:
-                for attachment in attachments:
-                    if "application/pdf" in attachment["attachmentType"]["mimeType"]:
-                        pdf_text = fetch_attachment(attachment["attachmentId"])
-                        attachment_content.extend(pdf_text)
-
-            return seinet_id, content, date, attachment_content
-
-
-def fetch_attachment(attachment_id: int) -> List[str]:
-    url = f"https://api.seinet.com.mk/public/documents/attachment/{attachment_id}"
-
-    with requests.get(url) as response:
-        pdf = PdfReader(BytesIO(response.content))
-        contents: List[str] = []
-        
-        for page in pdf.pages:
-            text = page.extract_text()
-            contents.extend(line.strip() for line in text.split("\n") if line.strip())
- 
-        return contents
\ No newline at end of file
+    response = await http.post(url, json=params)
+
+    if response.status != 200:
+        raise HttpError(url, f"Unexpected status {response.status}", response.status)
+
+    json_data = response.json()
+    total = next((json_data[key] for key in TOTAL_KEYS if isinstance(json_data.get(key), int)), None)
+    return [item["documentId"] for item in json_data["data"] or []], total
+
+
+async def iter_news(http: HttpSession, issuer_id: int, last_date: Optional[date], concurrency: int = 4,
+                    page_size: int = PAGE_SIZE) -> AsyncIterator[List[NewsID]]:
+    """Document ids of every listing page in order, fetching pages ahead while more of them are expected"""
+    date_from = last_date or datetime.now() - timedelta(days=365)
+    date_to = datetime.now()  # Fixed for the whole walk, so documents published meanwhile do not shift the pages
+    pending: Deque[asyncio.Task] = deque()
+    next_page, listed, ahead = 1, 0, 1
+    served: Optional[int] = None  # Length of the first page shorter than the page size asked for
+    capped = False
+
+    try:
+        while True:
+            while len(pending) < ahead:
+                pending.append(asyncio.create_task(
+                    fetch_news_page(http, issuer_id, date_from, date_to, next_page, page_size)
+                ))
+                next_page += 1
+
+            news_ids, total = await pending.popleft()
+
+            if not news_ids:
+                break
+
+            yield news_ids
+            listed += len(news_ids)
+
+            if total is not None and listed >= total:
+                break
+
+            if served is None and len(news_ids) < page_size:
+                served = len(news_ids)  # Either the last page or the most the API serves at once
+
+                # Without a total only the next page tells, so nothing is fetched ahead of it
+                if total is None:
+                    ahead = 1
+                    continue
+            elif total is None and served is not None and len(news_ids) < served:
+                break  # Shorter than the pages before it, so the last one
+
+            # More documents after a short page mean the API caps the page size below the one asked for
+            if served is not None and not capped:
+                capped = True
+                metrics.inc("seinet_page_size_capped_total")
+                print(f"SEINet serves {served} documents per page instead of {page_size}")
+
+            ahead = concurrency
+    finally:
+        for task in pending:
+            task.cancel()
+
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def fetch_article(http: HttpSession, news_id: int, extractor: AttachmentExtractor) -> Optional[NewsContent]:
+    url = f"{SEINET_API_URL}/public/documents/single/{news_id}"
+
+    response = await http.get(url, cache=True)
+
+    if response.status != 200:
+        return None
+    
+    json_data = response.json()
+
+    if not json_data["data"]:
+        return None
+
+    article = json_data["data"]
+    seinet_id = article["documentId"]
+    content = article.get("content", "")
+    date = datetime.strptime(article["publishedDate"].split(".")[0], "%Y-%m-%dT%H:%M:%S").date()
+    
+    attachment_content: List[str] = []
+    attachments = article["attachments"] or []
+    pdf_texts = await asyncio.gather(*(
+        fetch_attachment(http, attachment["attachmentId"], extractor)
+        for attachment in attachments
+        if "application/pdf" in attachment["attachmentType"]["mimeType"]
+    ))
+
+    for pdf_text in pdf_texts:
+        attachment_content.extend(pdf_text)
+
+    return seinet_id, content, date, attachment_content
+
+
+async def fetch_attachment(http: HttpSession, attachment_id: int, extractor: AttachmentExtractor) -> List[str]:
+    """Text of a PDF attachment, or nothing when it cannot be downloaded or read within the limits"""
+    url = f"{SEINET_API_URL}/public/documents/attachment/{attachment_id}"
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as buffer:
+        try:
+            response = await http.download(url, buffer, extractor.max_bytes)
+        except CacheMissError:
+            raise  # An offline run must not store the article without its attachment text
+        except HttpError as e:
+            print(f"Skipping attachment {attachment_id}: {e}")
+            return []
+
+        if response.status != 200:
+            return []
+
+        buffer.flush()
+
+        try:
+            return await extractor.extract(buffer.name)
+        except Exception as e:
+            metrics.inc("attachments_skipped_total", reason=type(e).__name__)
+            print(f"Skipping unreadable attachment {attachment_id}: {e!r}")
+            return []
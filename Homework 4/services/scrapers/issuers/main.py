@@ -1,80 +1,141 @@
 import os
 import sys
-import utils
 import asyncio
-from typing import List
+from typing import Any, List, Optional, Tuple
 from dotenv import load_dotenv
-from aiohttp import ClientSession
 from datetime import datetime, timedelta, date
-from bs4 import BeautifulSoup, SoupStrainer
 
 parent_dir = os.path.dirname(os.path.dirname(__file__))
 sys.path.append(parent_dir)
 
 load_dotenv()
 
+import utils
 from shared.base_scraper import BaseScraper
+from shared.catalog import IssuerCatalog
+from shared.parsers import get_parser
+from shared.trading_calendar import TradingCalendar
+from shared.urls import MSE_BASE_URL
+from shared.tracing import tracer
+from planner import WindowPlanner
+from shared.daemon import Daemon
 from shared.decorators import MultiProcessScraper, LoggerScraper
 
 # Type aliases
 IssuerCode = str
 StockHistory = List[List[str]]  # [date, last_trade_price, max_price, min_price, avg_price, percent_change, volume, turnover_best, total_turnover]
 CompanyData = List[str]  # [code, name, address, city, state, email, website, contact_person, phones, fax]
+IssuerItem = Tuple[IssuerCode, Optional[int], Optional[date], Optional[CompanyData]]  # (code, issuer_id, last_date, company_data fetched by the catalog refresh)
 
 
-class IssuerScraper(BaseScraper[IssuerCode, date]):
-    def __init__(self, db_params: dict[str, str]) -> None:
-        super().__init__(db_params)
-        
+class IssuerScraper(BaseScraper[IssuerItem, date]):
+    def __init__(self, db_params: dict[str, str], http_params: Optional[dict[str, Any]] = None) -> None:
+        super().__init__(db_params, http_params)
+        self.calendar = TradingCalendar()
+        self.planner = WindowPlanner(self.calendar)
+        self.calendar_loaded = False
+        self.catalog = IssuerCatalog(self)
+
     async def connect_db(self) -> None:
         await self.db.connect()
         await self.db.create_issuer_tables()
+        await self.db.create_issuer_catalog_table()
 
-    async def fetch_items(self) -> List[IssuerCode]:
-        url = "https://www.mse.mk/en/stats/current-schedule"
+    async def load_calendar(self) -> None:
+        """Learn no-trade days from the stock history of the last two years, once per process"""
+        if self.calendar_loaded:
+            return
+
+        self.calendar_loaded = True
+        since = datetime.now().date() - timedelta(days=730)
+        self.calendar.learn(await self.db.get_trading_dates(since))
+
+    async def fetch_items(self) -> List[IssuerItem]:
+        url = f"{MSE_BASE_URL}/en/stats/current-schedule"
         excluded = ['CKB', 'SNBTO', 'TTK']  # Excluded bonds
-        issuers: List[IssuerCode] = []
+        issuers: List[IssuerItem] = []
+
+        response = await self.http.get(url)
+        watermarks = await self.db.get_issuer_watermarks()
+        await self.load_calendar()
+        latest_trading_day = self.calendar.latest_trading_day()
+        skipped = 0
+        codes = [
+            row[0] for row in get_parser().table_rows(response.text())
+            if row[0] not in excluded and not any(char.isdigit() for char in row[0])
+        ]
 
-        async with ClientSession() as session:
-            async with session.get(url) as response:
-                response_text = await response.text()
-                soup = BeautifulSoup(response_text, "lxml", parse_only=SoupStrainer("tbody"))
+        profiles, changed = await self.catalog.refresh(codes)
+        await self.update_companies({code: profiles[code] for code in changed if code in watermarks})
 
-                for row in soup.select("tr"):
-                    code = row.select("td")[0].text.strip()
-                    if code not in excluded and not any(char.isdigit() for char in code):
-                        issuers.append(code)
+        for code in codes:
+            issuer_id, last_date = watermarks.get(code, (None, None))
 
-                return issuers
+            if last_date is not None and last_date >= latest_trading_day:
+                skipped += 1
+                continue
 
-    async def fetch_last_available_date(self, item: IssuerCode) -> date:
-        last_date = await self.db.get_last_available_issuer_date(item)
-        return last_date or (datetime.now() - timedelta(days=3650)).date()
+            # Issuers stored for the first time reuse the profile the catalog refresh just fetched
+            issuers.append((code, issuer_id, last_date, profiles.get(code) if issuer_id is None else None))
 
-    async def fill_in_missing_data(self, last_date: date, item: IssuerCode) -> None:
-        stock_history = await utils.fetch_stock_history(item, last_date)
-        
-        if not stock_history:
-            return
-            
-        found = await self.db.find_issuer_by_code(item)
-        
-        if found is None:
-            company_data = await utils.fetch_company(item, "en")
-            company_data_mk = await utils.fetch_company(item, "mk")
-            found = await self.db.assign_issuer(item, company_data)
-            await self.db.assign_issuer_mk(found, company_data_mk)
-    
-        entries = [
-            [found, datetime.strptime(stock_entry[0].replace(".", "/"), "%d/%m/%Y").date()] + stock_entry[1:]
-            for stock_entry in stock_history
-        ]
-    
-        await self.db.batch_add_stock_entries(entries)
+        print(f"Skipping {skipped} issuers that are up to date as of {latest_trading_day}")
+        return issuers
+
+    async def update_companies(self, changed: dict[str, CompanyData]) -> None:
+        """Store the profiles of stored issuers whose catalog hash changed, with their Macedonian versions"""
+        async def update(code: str, company_data: CompanyData) -> None:
+            company_data_mk = await utils.fetch_company(self.http, code, "mk")
+            await self.db.update_company(company_data)
+            await self.db.update_company_mk(company_data_mk)
+
+        results = await asyncio.gather(*(update(code, data) for code, data in changed.items()), return_exceptions=True)
+
+        for code, result in zip(changed, results):
+            if isinstance(result, Exception):
+                print(f"Failed to update the company profile of {code}: {result}")
+
+    def item_key(self, item: IssuerItem) -> str:
+        return item[0]
+
+    async def refresh_items(self, items: List[IssuerItem]) -> List[IssuerItem]:
+        """Resumed issuers with the history stored since they were queued, so it is not fetched again"""
+        watermarks = await self.db.get_issuer_watermarks()
+        refreshed: List[IssuerItem] = []
+
+        for code, issuer_id, last_date, company_data in items:
+            issuer_id, last_date = watermarks.get(code, (issuer_id, last_date))
+            refreshed.append((code, issuer_id, last_date, company_data if issuer_id is None else None))
+
+        return refreshed
+
+    async def fetch_last_available_date(self, item: IssuerItem) -> date:
+        """First day missing from the stored history"""
+        _, _, last_date, _ = item
+        return (last_date or (datetime.now() - timedelta(days=3650)).date()) + timedelta(days=1)
+
+    async def fill_in_missing_data(self, from_date: date, item: IssuerItem) -> None:
+        code, found, _, company_data = item
+
+        # Insert every window as soon as it arrives instead of waiting for the whole history
+        async for stock_history in utils.iter_stock_history(self.http, code, from_date, self.planner):
+            if found is None:
+                company_data = company_data or await utils.fetch_company(self.http, code, "en")
+                company_data_mk = await utils.fetch_company(self.http, code, "mk")
+                found = await self.db.assign_issuer(code, company_data)
+                await self.db.assign_issuer_mk(found, company_data_mk)
+
+            entries = [
+                [found, utils.parse_row_date(stock_entry[0])] + stock_entry[1:]
+                for stock_entry in stock_history
+            ]
+
+            await self.db.batch_add_stock_entries(entries)
             
-    async def process_item(self, item: IssuerCode) -> None:
-        last_date = await self.fetch_last_available_date(item)
-        await self.fill_in_missing_data(last_date, item)
+    async def process_item(self, item: IssuerItem) -> None:
+        tracer.annotate(issuer=item[0])
+        await self.load_calendar()  # Worker processes plan windows with their own calendar
+        from_date = await self.fetch_last_available_date(item)
+        await self.fill_in_missing_data(from_date, item)
 
 
 if __name__ == "__main__":
@@ -84,8 +145,20 @@ if __name__ == "__main__":
         "user": os.getenv("DB_USER", "postgres"),
         "password": os.getenv("DB_PASSWORD", "postgres")
     }
+
+    http_params = {
+        "limit_per_host": int(os.getenv("HTTP_LIMIT_PER_HOST", "10")),
+        "timeout": float(os.getenv("HTTP_TIMEOUT", "60")),
+        "cache_dir": os.getenv("HTTP_CACHE_DIR"),
+        "cache_all": os.getenv("HTTP_CACHE_ALL", "false").lower() == "true",  # Record every response for offline runs
+        "offline": os.getenv("HTTP_OFFLINE", "false").lower() == "true"
+    }
     
-    scraper = IssuerScraper(db_params)
+    scraper = IssuerScraper(db_params, http_params)
     scraper = MultiProcessScraper(scraper)
     scraper = LoggerScraper(scraper)
-    asyncio.run(scraper.execute_scraping())
\ No newline at end of file
+
+    if "--daemon" in sys.argv:
+        asyncio.run(Daemon.from_env("issuer-scraper", scraper.connect, scraper.run_once, scraper.cleanup).serve())
+    else:
+        asyncio.run(scraper.execute_scraping())
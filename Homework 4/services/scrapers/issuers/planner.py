@@ -0,0 +1,71 @@
+from bisect import bisect_left
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from shared.trading_calendar import TradingCalendar
+
+# Type aliases
+Window = Tuple[date, date]  # (from_date, to_date), both inclusive
+
+
+class WindowPlanner:
+    """Plans symbolhistory range requests from the gap to fill and the site's observed row limit"""
+    def __init__(self, calendar: TradingCalendar, max_span_days: int = 365, max_rows: Optional[int] = None,
+                 min_truncated_rows: int = 100) -> None:
+        self.calendar = calendar
+        self.max_span_days = max_span_days  # Longest range the site serves in one response
+        self.max_rows = max_rows  # Most rows the site returns in one response, once confirmed
+        self.min_truncated_rows = min_truncated_rows  # Smaller responses are never taken for cut-off ones
+        self.largest_response = 0
+        self.suspected: Dict[Window, int] = {}  # Follow-up window -> row count of the response that stopped short
+
+    def plan(self, start: date, end: date) -> List[Window]:
+        """Fewest windows covering every trading day between start and end, skipping closed stretches"""
+        days = self.calendar.trading_days(start, end)
+        windows: List[Window] = []
+        i = 0
+
+        while i < len(days):
+            # Stretch the edges over the closed days around the window so consecutive windows touch,
+            # unless the closed stretch alone is longer than a window may span
+            window_start = start if not windows else windows[-1][1] + timedelta(days=1)
+            span = timedelta(days=self.max_span_days - 1)
+
+            if days[i] - window_start > span:
+                window_start = days[i]
+
+            last_allowed = window_start + span
+            j = bisect_left(days, last_allowed + timedelta(days=1)) - 1
+
+            if self.max_rows is not None:
+                j = min(j, i + self.max_rows - 1)
+
+            # A window bound by its span covers the closed days up to its limit too, so the next one starts later
+            spanned = j == len(days) - 1 or days[j + 1] > last_allowed
+            window_end = min(end, last_allowed) if spanned else days[j]
+            windows.append((window_start, window_end))
+            i = j + 1
+
+        return windows
+
+    def remainder(self, window: Window, rows: int, earliest: Optional[date]) -> Optional[Window]:
+        """Part of a window a truncated response did not cover, learning the row limit on the way"""
+        if window in self.suspected:
+            suspected_rows = self.suspected.pop(window)
+
+            # Rows before a suspected cut-off confirm that the site stopped at its row limit
+            if rows > 0:
+                self.max_rows = suspected_rows if self.max_rows is None else min(self.max_rows, suspected_rows)
+
+        self.largest_response = max(self.largest_response, rows)
+        window_start, _ = window
+
+        if earliest is None or rows < max(self.min_truncated_rows, self.largest_response):
+            return None
+
+        if not self.calendar.trading_days(window_start, earliest - timedelta(days=1)):
+            return None
+
+        # A full-size response that stops short of the window start was either cut off or the issuer was listed later
+        remainder = (window_start, earliest - timedelta(days=1))
+        self.suspected[remainder] = rows
+        return remainder
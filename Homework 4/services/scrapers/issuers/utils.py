@@ -1,129 +1,76 @@
-import time
 import asyncio
-from typing import List
-from aiohttp import ClientSession
-from aiolimiter import AsyncLimiter
-from datetime import datetime, timedelta
-from bs4 import BeautifulSoup, SoupStrainer
+from typing import AsyncIterator, Dict, List, Set
+from datetime import datetime, date
+from shared.catalog import fetch_symbol
+from shared.http import HttpSession
+from shared.parsers import get_parser
+from shared.metrics import metrics
+from shared.retry import HttpError
+from shared.urls import MSE_BASE_URL
+from planner import Window, WindowPlanner
 
 # Type aliases
 CompanyData = List[str]  # [code, name, address, city, state, email, website, contact_person, phones, fax]
 StockHistory = List[List[str]]  # [date, last_trade_price, max_price, min_price, avg_price, percent_change, volume, turnover_best, total_turnover]
 
 
-async def fetch_company(code: str, locale: str) -> CompanyData:
-    url = f"https://www.mse.mk/{locale}/symbol/{code}"
+async def fetch_company(http: HttpSession, code: str, locale: str) -> CompanyData:
+    _, company_data = await fetch_symbol(http, code, locale)
+    return company_data
 
-    translate_to_en = {
-        "Адреса": "Address",
-        "Град": "City",
-        "Држава": "State",
-        "Телефон": "Phone",
-        "Факс": "Fax",
-        "e-mail адреса": "Mail",
-        "Веб страница": "Site",
-        "Лице за контакт": "Contact person",
-    }
 
-    company_data = {
-        "Code": code,
-        "Name": "",
-        "Address": "",
-        "City": "",
-        "State": "",
-        "Mail": "",
-        "Site": "",
-        "Contact person": "",
-        "Phone": [],
-        "Fax": []
+def parse_row_date(value: str) -> date:
+    """Parse the dd.mm.yyyy date of a symbolhistory row"""
+    return datetime.strptime(value.replace(".", "/"), "%d/%m/%Y").date()
+
+
+async def iter_stock_history(http: HttpSession, code: str, from_date: date, planner: WindowPlanner) -> AsyncIterator[StockHistory]:
+    """Yield the rows of each planned window, sorted by date, as soon as the window arrives"""
+    to_date = datetime.now().date()
+
+    async def fetch_data(window: Window) -> StockHistory:
+        first, last = window
+        url = f"{MSE_BASE_URL}/mk/stats/symbolhistory/{code}?FromDate={first:%d,%m,%Y}&ToDate={last:%d,%m,%Y}"
+        response = await http.get(url)
+
+        if response.status != 200:
+            raise HttpError(url, f"Unexpected status {response.status}", response.status)
+
+        with metrics.time("parse", operation="symbolhistory") as span:
+            rows = get_parser().table_rows(response.text())
+            span.set(rows=len(rows), first=first, last=last)
+
+        return [cols for cols in rows if all(col != "" for col in cols)]
+
+    pending: Dict[asyncio.Future, Window] = {
+        asyncio.ensure_future(fetch_data(window)): window
+        for window in planner.plan(from_date, to_date)
     }
+    seen: Set[date] = set()
+
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                window = pending.pop(task)
+                rows = await task
+                dates = [parse_row_date(row[0]) for row in rows]
+
+                # Ask for whatever a truncated response left out instead of pre-splitting every range
+                if remainder := planner.remainder(window, len(rows), min(dates, default=None)):
+                    pending[asyncio.ensure_future(fetch_data(remainder))] = remainder
+
+                merged: Dict[date, List[str]] = {}
+
+                for row_date, row in zip(dates, rows):
+                    if row_date not in seen:
+                        merged.setdefault(row_date, row)
+
+                seen.update(merged)
 
-    async with ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status != 200:
-                time.sleep(1)
-                return await fetch_company(code, locale)
-            
-            response_text = await response.text()
-            soup = BeautifulSoup(response_text, 'lxml', parse_only=SoupStrainer('div'))
-
-            title = soup.select_one("div.title")
-
-            if title is None:
-                title = soup.select_one("div#titleKonf2011")
-
-                if title:
-                    return [code, title.text.split(" - ")[2]]
-                else:
-                    return [code, code]
-
-            company_data["Name"] = title.text
-            details = soup.select("div#izdavach .row")[2:13]
-
-            for row in details:
-                cols = row.select("div")
-
-                if cols:
-                    key_text = cols[0].text.strip("\n")
-
-                    if locale == "mk" and key_text in translate_to_en:
-                        key_text = translate_to_en[key_text]
-
-                    if key_text in company_data:
-                        if key_text in ("Phone", "Fax"):
-                            company_data[key_text].extend(cols[1].text.split("; "))
-                        else:
-                            company_data[key_text] = cols[1].text
-                    else:
-                        try:
-                            company_data["Contact person"] = cols[1].text.split("\n")[1]
-                        except IndexError:
-                            company_data["Contact person"] = cols[1].text.strip()
-
-    return list(company_data.values())
-
-
-async def fetch_stock_history(code: str, from_date: datetime) -> StockHistory:
-    to_time = datetime.now().date()
-    limiter = AsyncLimiter(max_rate=10, time_period=1)
-
-    data: StockHistory = []
-    tasks = []
-
-    async def fetch_data(url: str) -> StockHistory:
-        async with limiter:  # Apply rate limiting
-            async with ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        time.sleep(1)
-                        return await fetch_data(url)
-
-                    response_text = await response.text()
-                    soup = BeautifulSoup(response_text, 'lxml', parse_only=SoupStrainer('tbody'))
-                    rows = soup.select("tbody tr")
-                    
-                    fetched_data: StockHistory = []
-                    
-                    for row in rows:
-                        cols = [col.text.strip() for col in row.select("td")]
-                        if any(col == "" for col in cols):
-                            continue
-                        fetched_data.append(cols)
-                        
-                    return fetched_data
-
-    while to_time > from_date:
-        to_date = to_time.strftime("%d,%m,%Y")
-        from_date_str = from_date.strftime("%d,%m,%Y")
-        url = f"https://www.mse.mk/mk/stats/symbolhistory/{code}?FromDate={from_date_str}&ToDate={to_date}"
-        tasks.append(fetch_data(url))
-        to_time -= timedelta(days=365)
-
-    results = await asyncio.gather(*tasks)
-
-    for result in results:
-        for row in result:
-            if row not in data:
-                data.append(row)
-
-    return data if data else None
\ No newline at end of file
+                if merged:
+                    yield [merged[row_date] for row_date in sorted(merged)]
+    finally:
+        for task in pending:
+            task.cancel()
@@ -1,63 +1,72 @@
 import os
 import sys
-import utils
 import asyncio
+from contextlib import aclosing
 from datetime import datetime
 from dotenv import load_dotenv
-from typing import List, Tuple, Optional
-from aiohttp import ClientSession
-from bs4 import BeautifulSoup, SoupStrainer
+from typing import Any, AsyncIterator, List, Tuple, Optional
 
 parent_dir = os.path.dirname(os.path.dirname(__file__))
 sys.path.append(parent_dir)
 
 load_dotenv()
 
+import utils
 from shared.base_scraper import BaseScraper
-from shared.decorators import MultiProcessScraper, LoggerScraper
+from shared.tracing import tracer
+from shared.daemon import Daemon
+from shared.decorators import ConcurrentScraper, LoggerScraper
 
 # Type aliases
 NewsItem = Tuple[str, str]  # (en_link, mk_link)
 NewsContent = Optional[Tuple[str, str, List[str]]]  # (title, date, content) or None
 ProcessedNews = Tuple[NewsContent, NewsContent]  # (en_news, mk_news)
 
+# Pages of the latest news listing on mse.mk
+LISTING_PAGES = 39
+
 
 class NewsScraper(BaseScraper[NewsItem, None]):
-    def __init__(self, db_params: dict[str, str]) -> None:
-        super().__init__(db_params)
+    def __init__(self, db_params: dict[str, str], http_params: Optional[dict[str, Any]] = None,
+                 listing_concurrency: int = 4) -> None:
+        super().__init__(db_params, http_params)
+        self.listing_concurrency = listing_concurrency
         
     async def connect_db(self) -> None:
         await self.db.connect()
         await self.db.create_news_table()
 
     async def fetch_items(self) -> List[NewsItem]:
-        links: List[NewsItem] = []
-        
-        for i in range(1, 40):
-            url = f"https://www.mse.mk/en/news/latest/{i}"
-
-            async with ClientSession() as session:
-                async with session.get(url) as response:
-                    response_text = await response.text()
-                    soup = BeautifulSoup(response_text, "lxml", parse_only=SoupStrainer("div", {"id": "news-content"}))
-                    
-                    for link in soup.select("a"):
-                        if link.select_one("b"):
-                            en_link = link.get("href")
-                            mk_link = en_link.replace("en/", "mk/")
-                            links.append((en_link, mk_link))
-                            
-        return links
+        return [link async for links in self.iter_items() for link in links]
+
+    async def iter_items(self) -> AsyncIterator[List[NewsItem]]:
+        """New links of every listing page, newest first, up to the first page holding only links seen before"""
+        async with aclosing(utils.iter_listing_pages(self.http, LISTING_PAGES, self.listing_concurrency)) as pages:
+            async for links in pages:
+                if not links:
+                    break  # Past the last page of the listing
+
+                seen = await self.db.get_seen_news_links([en_link for en_link, _ in links])
+                new_links = [link for link in links if link[0] not in seen]
+
+                if not new_links:
+                    break  # Everything older was handled by earlier runs
+
+                yield new_links
+
+    def item_key(self, item: NewsItem) -> str:
+        return item[0]
 
     async def fetch_last_available_date(self, item: NewsItem) -> None:
         # This filter is not needed for news
         return None
     
-    async def fill_in_missing_data(self, last_date: None, item: NewsItem) -> None:
+    async def fill_in_missing_data(self, last_date: None, item: NewsItem) -> bool:
+        """Store both versions of an article, reporting whether it is stored now or was stored before"""
         news_en, news_mk = await self.process_news_item(item)
         
         if not news_en or not news_mk:
-            return
+            return False
         
         title_en, date_en, content_en = news_en
         title_mk, date_mk, content_mk = news_mk
@@ -65,22 +74,20 @@ class NewsScraper(BaseScraper[NewsItem, None]):
         parsed_date_en = datetime.strptime(date_en, "%A, %B %d, %Y").date()
         parsed_date_mk = utils.parse_macedonian_date(date_mk)
         
-        existing_news_en = await self.db.get_news(title_en, parsed_date_en, content_en)
-        existing_news_mk = await self.db.get_news_mk(title_mk, parsed_date_mk, content_mk)
-        
-        if existing_news_en or existing_news_mk:
-            return
-        
-        shared_id = await self.db.add_news(title_en, parsed_date_en, content_en, "en")
-        await self.db.add_news_mk(shared_id, title_mk, parsed_date_mk, content_mk)
+        # Both versions are written in one transaction, skipping articles stored before
+        await self.db.add_news_pair((title_en, parsed_date_en, content_en), (title_mk, parsed_date_mk, content_mk))
+        return True
             
     async def process_item(self, item: NewsItem) -> None:
-        await self.fill_in_missing_data(None, item)
+        tracer.annotate(link=item[0])
+
+        # Links of articles missing a version are left for a later run to retry
+        if await self.fill_in_missing_data(None, item):
+            await self.db.add_news_link(item[0])
         
     async def process_news_item(self, item: NewsItem) -> ProcessedNews:
         link_en, link_mk = item
-        news_en = await utils.fetch_news(link_en)
-        news_mk = await utils.fetch_news(link_mk)
+        news_en, news_mk = await asyncio.gather(utils.fetch_news(self.http, link_en), utils.fetch_news(self.http, link_mk))
         return news_en, news_mk
 
 
@@ -91,8 +98,20 @@ if __name__ == "__main__":
         "user": os.getenv("DB_USER", "postgres"),
         "password": os.getenv("DB_PASSWORD", "postgres")
     }
+
+    http_params = {
+        "limit_per_host": int(os.getenv("HTTP_LIMIT_PER_HOST", "10")),
+        "timeout": float(os.getenv("HTTP_TIMEOUT", "60")),
+        "cache_dir": os.getenv("HTTP_CACHE_DIR"),
+        "cache_all": os.getenv("HTTP_CACHE_ALL", "false").lower() == "true",  # Record every response for offline runs
+        "offline": os.getenv("HTTP_OFFLINE", "false").lower() == "true"
+    }
     
-    scraper = NewsScraper(db_params)
-    scraper = MultiProcessScraper(scraper)
+    scraper = NewsScraper(db_params, http_params)
+    scraper = ConcurrentScraper(scraper)
     scraper = LoggerScraper(scraper)
-    asyncio.run(scraper.execute_scraping())
\ No newline at end of file
+
+    if "--daemon" in sys.argv:
+        asyncio.run(Daemon.from_env("news-scraper", scraper.connect, scraper.run_once, scraper.cleanup).serve())
+    else:
+        asyncio.run(scraper.execute_scraping())
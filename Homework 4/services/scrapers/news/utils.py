@@ -1,27 +1,75 @@
-from typing import List, Tuple, Optional
-from aiohttp import ClientSession
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Deque, List, Tuple, Optional
 from datetime import datetime, date
 from bs4 import BeautifulSoup, SoupStrainer
+from shared.http import HttpSession
+from shared.parsers import get_parser
+from shared.metrics import metrics
+from shared.retry import HttpError
+from shared.urls import MSE_BASE_URL
 
 # Type aliases
+NewsItem = Tuple[str, str]  # (en_link, mk_link)
 NewsContent = Optional[Tuple[str, str, List[str]]]  # (title, date, content) or None
 
 
-async def fetch_news(link: str) -> NewsContent:
-    url = f"https://www.mse.mk{link}"
+async def fetch_listing_page(http: HttpSession, page: int) -> List[NewsItem]:
+    """Links of the articles on a page of the latest news listing"""
+    url = f"{MSE_BASE_URL}/en/news/latest/{page}"
+    response = await http.get(url)
 
-    async with ClientSession() as session:
-        async with session.get(url) as response:
-            response_text = await response.text()
-            soup = BeautifulSoup(response_text, "lxml", parse_only=SoupStrainer("main"))
-            title = soup.select_one(".col-md-9").text.strip() if soup.select_one(".col-md-9") else None
-            date = soup.select_one(".news-date").text.strip() if soup.select_one(".news-date") else None
-            content = [p.text.strip() for p in soup.select("#content > p")]
+    # An error page has no links either, and must not pass for the end of the listing
+    if response.status != 200:
+        raise HttpError(url, f"Unexpected status {response.status}", response.status)
 
-            if content == ["/"] or title is None or date is None:
-                return None
+    with metrics.time("parse", operation="news_listing"):
+        soup = BeautifulSoup(response.text(), "lxml", parse_only=SoupStrainer("div", {"id": "news-content"}))
 
-            return title, date, content
+    links: List[NewsItem] = []
+
+    for link in soup.select("a"):
+        if link.select_one("b"):
+            en_link = link.get("href")
+            links.append((en_link, en_link.replace("en/", "mk/")))
+
+    return links
+
+
+async def iter_listing_pages(http: HttpSession, pages: int, concurrency: int) -> AsyncIterator[List[NewsItem]]:
+    """Listing pages in order, fetching up to concurrency pages ahead of the one being consumed"""
+    pending: Deque[asyncio.Task] = deque()
+    next_page = 1
+
+    try:
+        while pending or next_page <= pages:
+            while next_page <= pages and len(pending) < concurrency:
+                pending.append(asyncio.create_task(fetch_listing_page(http, next_page)))
+                next_page += 1
+
+            yield await pending.popleft()
+    finally:
+        # Pages fetched ahead are not needed once the consumer stops early
+        for task in pending:
+            task.cancel()
+
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def fetch_news(http: HttpSession, link: str) -> NewsContent:
+    url = f"{MSE_BASE_URL}{link}"
+
+    response = await http.get(url)
+    if response.status != 200:
+        raise HttpError(url, f"Unexpected status {response.status}", response.status)
+
+    with metrics.time("parse", operation="news_article"):
+        title, date, content = get_parser().news_article(response.text())
+
+    if content == ["/"] or title is None or date is None:
+        return None
+
+    return title, date, content
         
         
 def parse_macedonian_date(date_str: str) -> date:
@@ -1,26 +1,144 @@
+import pickle
+import asyncio
+from datetime import datetime
 from abc import ABC, abstractmethod
-from typing import List, TypeVar, Generic
-from .database import Database
+from typing import Any, AsyncIterator, List, Optional, TypeVar, Generic
+from .database import Database, RunItemUpdate
+from .http import HttpSession
 
 T = TypeVar('T')  # Type variable for items
 R = TypeVar('R')  # Type variable for processed results
 
 class BaseScraper(ABC, Generic[T, R]):
-    def __init__(self, db_params: dict[str, str]) -> None:
-        """Initialize scraper with database parameters"""
+    def __init__(self, db_params: dict[str, str], http_params: Optional[dict[str, Any]] = None) -> None:
+        """Initialize scraper with database and HTTP session parameters"""
         self.db = Database(**db_params)
         self.db_params = db_params
+        self.http_params = http_params or {}
+        self.http = HttpSession(**self.http_params)
+        self.run_id: Optional[int] = None
+        self.max_item_attempts = 3  # Items failing this often are not retried by a resumed or the next run
+        self.journal_batch_size = 100  # Item outcomes written to the run journal at once
+        self.journal_updates: List[RunItemUpdate] = []
         
     async def execute_scraping(self) -> None:
+        await self.connect()
+
+        try:
+            await self.run_once()
+        finally:
+            await self.cleanup()
+
+    async def connect(self) -> None:
+        """Open the HTTP session and the database pool, which a daemon keeps open between runs"""
+        await self.connect_http()
         await self.connect_db()
-        items = await self.fetch_items()
+
+    async def run_once(self) -> None:
+        """Scrape once over already opened connections"""
+        items = await self.start_run()
         await self.process_data(items)
-        await self.cleanup()
+        await self.finish_run()
     
     async def process_data(self, items: List[T]) -> None:
         for item in items:
+            await self.execute_item(item)
+
+    @property
+    def scraper_name(self) -> str:
+        return self.__class__.__name__
+
+    def item_key(self, item: T) -> str:
+        """Stable identifier of an item in the run journal"""
+        return repr(item)
+
+    async def refresh_items(self, items: List[T]) -> List[T]:
+        """Items of an interrupted run with their watermarks read again, as they were pickled when first queued"""
+        return items
+
+    async def iter_items(self) -> AsyncIterator[List[T]]:
+        """Items to process in batches, yielded as soon as they are found; all fetched items at once by default"""
+        yield await self.fetch_items()
+
+    async def start_run(self) -> List[T]:
+        """Resume the interrupted run of this scraper, or fetch the items of a new run and journal them"""
+        return [item async for item in self.stream_run()]
+
+    async def stream_run(self) -> AsyncIterator[T]:
+        """Items of the interrupted run of this scraper, or of a new run with the failed items of the previous one, journaled batch by batch as they are found"""
+        await self.db.create_run_journal_tables()
+        run_id = await self.db.get_interrupted_run(self.scraper_name)
+
+        if run_id is not None:
+            items = [pickle.loads(item) for item in await self.db.resume_run(run_id, self.max_item_attempts)]
+            items = await self.refresh_items(items)
+            print(f"Resuming interrupted run {run_id} with {len(items)} unfinished items")
+            self.run_id = run_id
+
+            for item in items:
+                yield item
+
+            return
+
+        self.run_id = await self.db.start_run(self.scraper_name)
+        carried = [pickle.loads(item) for item in await self.db.carry_over_failed_items(self.run_id, self.scraper_name, self.max_item_attempts)]
+        carried = await self.refresh_items(carried)
+        keys = {self.item_key(item) for item in carried}
+
+        if carried:
+            print(f"Retrying {len(carried)} items that failed in the previous run")
+
+        for item in carried:
+            yield item
+
+        async for batch in self.iter_items():
+            # Listings shift while they are crawled, so an item can show up in two batches
+            batch = [item for item in batch if self.item_key(item) not in keys]
+            keys.update(self.item_key(item) for item in batch)
+            await self.db.add_run_items(self.run_id, [(self.item_key(item), pickle.dumps(item)) for item in batch])
+            await self.flush_journal()
+
+            for item in batch:
+                yield item
+
+    async def execute_item(self, item: T) -> None:
+        """Process an item, queueing whether it finished for the next write to the run journal"""
+        if self.run_id is None:
+            return await self.process_item(item)
+
+        started_at = datetime.now()
+
+        try:
             await self.process_item(item)
+        except (Exception, asyncio.CancelledError) as e:
+            self.journal_updates.append((self.run_id, self.item_key(item), "failed", repr(e), started_at, datetime.now()))
+            raise
+
+        self.journal_updates.append((self.run_id, self.item_key(item), "done", None, started_at, datetime.now()))
+
+        if len(self.journal_updates) >= self.journal_batch_size:
+            await self.flush_journal()
+
+    async def flush_journal(self) -> None:
+        """Write the queued item outcomes to the run journal in one batch"""
+        updates, self.journal_updates = self.journal_updates, []
+
+        if updates:
+            await self.db.mark_run_items(updates)
+
+    async def finish_run(self) -> None:
+        """Close the run; the next run retries the items that failed"""
+        if self.run_id is None:
+            return
+
+        await self.flush_journal()
+
+        await self.db.finish_run(self.run_id)
         
+    async def connect_http(self) -> None:
+        """Open the HTTP session shared by the whole run"""
+        await self.http.open()
+
     @abstractmethod
     async def connect_db(self) -> None:
         """Connect to database and create necessary tables"""
@@ -48,4 +166,5 @@ class BaseScraper(ABC, Generic[T, R]):
 
     async def cleanup(self) -> None:
         """Cleanup resources after scraping"""
-        await self.db.close()
\ No newline at end of file
+        await self.db.close()
+        await self.http.close()
\ No newline at end of file
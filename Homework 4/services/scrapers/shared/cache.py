@@ -0,0 +1,177 @@
+import os
+import re
+import json
+import time
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+# Type aliases
+CacheKey = str  # sha256 of the request
+
+# Timestamps in request payloads, such as the dateTo of a listing request that is always "now"
+TIMESTAMP = re.compile(r"^(\d{4}-\d{2}-\d{2})T\d{2}:\d{2}:\d{2}(\.\d+)?$")
+
+
+def normalize_payload(payload: Any) -> Any:
+    """Payload with timestamps cut down to their date, so that repeated requests of a day share a cache entry"""
+    if isinstance(payload, dict):
+        return {name: normalize_payload(value) for name, value in payload.items()}
+    if isinstance(payload, list):
+        return [normalize_payload(value) for value in payload]
+    if isinstance(payload, str) and (match := TIMESTAMP.match(payload)):
+        return match.group(1)
+
+    return payload
+
+
+class CacheEntry:
+    """Cached response body together with the metadata needed to revalidate it"""
+    def __init__(self, key: CacheKey, metadata: Dict[str, Any], body: bytes) -> None:
+        self.key = key
+        self.metadata = metadata
+        self.body = body
+
+    @property
+    def stored_at(self) -> float:
+        return self.metadata["stored_at"]
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry"""
+        headers = {}
+
+        if etag := self.metadata["headers"].get("ETag"):
+            headers["If-None-Match"] = etag
+        if last_modified := self.metadata["headers"].get("Last-Modified"):
+            headers["If-Modified-Since"] = last_modified
+
+        return headers
+
+
+class ResponseCache:
+    """On-disk HTTP response cache keyed by request hash, with TTL and size-bounded LRU eviction"""
+    # Response headers worth keeping for revalidation and decoding
+    kept_headers = ("ETag", "Last-Modified", "Content-Type")
+
+    def __init__(self, directory: str, ttl: float = 7 * 24 * 3600, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size: Optional[int] = None
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(method: str, url: str, payload: Any = None) -> CacheKey:
+        request = json.dumps([method.upper(), url, normalize_payload(payload)], sort_keys=True, default=str)
+        return hashlib.sha256(request.encode()).hexdigest()
+
+    def _paths(self, key: CacheKey) -> Tuple[str, str]:
+        base = os.path.join(self.directory, key[:2], key)
+        return f"{base}.json", f"{base}.body"
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        """Load an entry and mark it as recently used"""
+        metadata_path, body_path = self._paths(key)
+
+        try:
+            with open(metadata_path, "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+
+        return CacheEntry(key, metadata, body)
+
+    def is_fresh(self, entry: CacheEntry, ttl: Optional[float] = None) -> bool:
+        return time.time() - entry.stored_at < (self.ttl if ttl is None else ttl)
+
+    def put(self, key: CacheKey, url: str, status: int, headers: Dict[str, str], body: bytes, encoding: str) -> None:
+        """Store a response, replacing files atomically so concurrent processes never read partial entries"""
+        lowered = {name.lower(): value for name, value in headers.items()}
+        metadata = {
+            "url": url,
+            "status": status,
+            "headers": {name: lowered[name.lower()] for name in self.kept_headers if name.lower() in lowered},
+            "encoding": encoding,
+            "stored_at": time.time()
+        }
+
+        self._grow(key, len(body))
+        self._write(key, metadata, body)
+
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def touch(self, key: CacheKey, entry: CacheEntry) -> None:
+        """Mark an entry as fresh again after a successful revalidation"""
+        entry.metadata["stored_at"] = time.time()
+        self._write(key, entry.metadata, None)
+
+    def _write(self, key: CacheKey, metadata: Dict[str, Any], body: Optional[bytes]) -> None:
+        metadata_path, body_path = self._paths(key)
+        os.makedirs(os.path.dirname(metadata_path), exist_ok=True)
+        suffix = f".{os.getpid()}.tmp"
+
+        if body is not None:
+            with open(body_path + suffix, "wb") as f:
+                f.write(body)
+            os.replace(body_path + suffix, body_path)
+
+        with open(metadata_path + suffix, "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+        os.replace(metadata_path + suffix, metadata_path)
+
+    def _grow(self, key: CacheKey, size: int) -> None:
+        """Track the size of an entry about to be written, replacing the size of the entry it overwrites"""
+        if self.size is None:
+            self.size = sum(entry_size for _, entry_size, _ in self._entries())
+
+        try:
+            previous = os.stat(self._paths(key)[1]).st_size
+        except OSError:
+            previous = 0
+
+        self.size += size - previous
+
+    def _entries(self) -> List[Tuple[str, int, float]]:
+        """(body path, size, last use) of every entry on disk"""
+        entries = []
+
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".body"):
+                    path = os.path.join(root, name)
+
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+
+                    entries.append((path, stat.st_size, stat.st_mtime))
+
+        return entries
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits into 90% of its size bound"""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        size = sum(entry_size for _, entry_size, _ in entries)
+        target = self.max_bytes * 0.9
+
+        for path, entry_size, _ in entries:
+            if size <= target:
+                break
+
+            for stale in (path, path[:-len(".body")] + ".json"):
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+
+            size -= entry_size
+
+        self.size = size
@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+from bs4 import BeautifulSoup, SoupStrainer
+from .base_scraper import BaseScraper
+from .database import Database
+from .http import HttpSession
+from .metrics import metrics
+from .retry import HttpError
+from .urls import MSE_BASE_URL
+
+# Type aliases
+CompanyData = List[Any]  # [code, name, address, city, state, email, website, contact_person, phones, fax]
+SymbolPage = Tuple[Optional[int], CompanyData]  # (seinet_id, company_data)
+CatalogRefresh = Tuple[Dict[str, CompanyData], Set[str]]  # (profile of every refreshed issuer, codes whose profile changed)
+
+
+def parse_company(soup: BeautifulSoup, code: str, locale: str) -> CompanyData:
+    """Company profile shown on the symbol page of an issuer"""
+    translate_to_en = {
+        "Адреса": "Address",
+        "Град": "City",
+        "Држава": "State",
+        "Телефон": "Phone",
+        "Факс": "Fax",
+        "e-mail адреса": "Mail",
+        "Веб страница": "Site",
+        "Лице за контакт": "Contact person",
+    }
+
+    company_data = {
+        "Code": code,
+        "Name": "",
+        "Address": "",
+        "City": "",
+        "State": "",
+        "Mail": "",
+        "Site": "",
+        "Contact person": "",
+        "Phone": [],
+        "Fax": []
+    }
+
+    title = soup.select_one("div.title")
+
+    if title is None:
+        title = soup.select_one("div#titleKonf2011")
+
+        if title:
+            return [code, title.text.split(" - ")[2]]
+        else:
+            return [code, code]
+
+    company_data["Name"] = title.text
+    details = soup.select("div#izdavach .row")[2:13]
+
+    for row in details:
+        cols = row.select("div")
+
+        if cols:
+            key_text = cols[0].text.strip("\n")
+
+            if locale == "mk" and key_text in translate_to_en:
+                key_text = translate_to_en[key_text]
+
+            if key_text in company_data:
+                if key_text in ("Phone", "Fax"):
+                    company_data[key_text].extend(cols[1].text.split("; "))
+                else:
+                    company_data[key_text] = cols[1].text
+            else:
+                try:
+                    company_data["Contact person"] = cols[1].text.split("\n")[1]
+                except IndexError:
+                    company_data["Contact person"] = cols[1].text.strip()
+
+    return list(company_data.values())
+
+
+def parse_seinet_id(soup: BeautifulSoup) -> Optional[int]:
+    """SEINet id of the issuer, taken from the link to its SEINet search page"""
+    link = soup.select_one("a[href^='https://seinet.com.mk/search/']")
+    return int(link.get("href").split("/")[-1]) if link is not None else None
+
+
+def profile_hash(company_data: CompanyData) -> str:
+    return hashlib.sha256(json.dumps(company_data, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+async def fetch_symbol(http: HttpSession, code: str, locale: str, cache: bool = True) -> SymbolPage:
+    url = f"{MSE_BASE_URL}/{locale}/symbol/{code}"
+    response = await http.get(url, cache=cache)
+
+    if response.status != 200:
+        raise HttpError(url, f"Unexpected status {response.status}", response.status)
+
+    with metrics.time("parse", operation="company"):
+        soup = BeautifulSoup(response.text(), "lxml", parse_only=SoupStrainer("div"))
+
+    return parse_seinet_id(soup), parse_company(soup, code, locale)
+
+
+class IssuerCatalog:
+    """SEINet ids and company profile hashes of issuers, kept in issuer_catalog and refreshed once past their TTL"""
+    def __init__(self, scraper: BaseScraper, ttl: timedelta = timedelta(days=7), concurrency: int = 8) -> None:
+        self.scraper = scraper
+        self.ttl = ttl
+        self.concurrency = concurrency
+
+    @property
+    def db(self) -> Database:
+        # Read on every use, worker processes replace the connections of their scraper
+        return self.scraper.db
+
+    @property
+    def http(self) -> HttpSession:
+        return self.scraper.http
+
+    async def refresh(self, codes: List[str]) -> CatalogRefresh:
+        """Refresh the entries of the given issuers that are missing or expired, returning the profiles fetched"""
+        entries = await self.db.get_catalog_entries()
+        expired = datetime.now() - self.ttl
+        stale = [code for code in dict.fromkeys(codes) if code not in entries or entries[code][2] < expired]
+        semaphore = asyncio.Semaphore(self.concurrency)
+        profiles: Dict[str, CompanyData] = {}
+        changed: Set[str] = set()
+
+        async def refresh_entry(code: str) -> bool:
+            async with semaphore:
+                try:
+                    # Bypass the response cache, an expired entry has to be checked against the live page
+                    seinet_id, company_data = await fetch_symbol(self.http, code, "en", cache=False)
+                except Exception as e:
+                    print(f"Failed to refresh catalog entry of {code}: {e}")
+                    return False
+
+                digest = profile_hash(company_data)
+                await self.db.upsert_catalog_entry(code, seinet_id, digest)
+                profiles[code] = company_data
+
+                if code in entries and entries[code][1] != digest:
+                    changed.add(code)
+
+                return True
+
+        refreshed = await asyncio.gather(*(refresh_entry(code) for code in stale))
+        print(f"Refreshed {refreshed.count(True)} of {len(stale)} expired catalog entries ({len(changed)} changed)")
+        return profiles, changed
@@ -0,0 +1,46 @@
+import asyncio
+import reprlib
+from typing import AsyncIterable, Awaitable, Callable, Iterable, List, Optional, Union
+from .base_scraper import T
+from .metrics import metrics
+
+
+async def process_concurrently(process_item: Callable[[T], Awaitable[None]],
+                               items: Union[Iterable[T], AsyncIterable[T]], concurrency: int,
+                               timeout: Optional[float] = None) -> int:
+    """Process items concurrently in the running event loop and return the number of failed items"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def process(item: T) -> bool:
+        async with semaphore:
+            try:
+                with metrics.time("item") as span:
+                    span.set(item=reprlib.repr(item))
+                    await asyncio.wait_for(process_item(item), timeout)
+                metrics.inc("items_processed_total", result="ok")
+                return True
+            except asyncio.TimeoutError:
+                metrics.inc("items_processed_total", result="timeout")
+                print(f"Timed out processing {item} after {timeout} seconds")
+                return False
+            except Exception as e:
+                metrics.inc("items_processed_total", result="failed")
+                print(f"Failed to process {item}: {e}")
+                return False
+
+    if not isinstance(items, AsyncIterable):
+        results = await asyncio.gather(*(process(item) for item in items))
+        return results.count(False)
+
+    tasks: List[asyncio.Task] = []
+
+    try:
+        async for item in items:
+            tasks.append(asyncio.create_task(process(item)))  # Runs once a slot frees up, while more items stream in
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    results = await asyncio.gather(*tasks)
+    return results.count(False)
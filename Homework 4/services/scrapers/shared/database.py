@@ -1,30 +1,86 @@
-from datetime import date
-from typing import List, Tuple, Optional, Any
+import hashlib
+from datetime import date, datetime
+from typing import Dict, List, Set, Tuple, Optional
 from asyncpg import create_pool, Pool
+from .metrics import metrics, timed
+from .tracing import tracer
 
 # Type aliases
 StockEntry = Tuple[int, date, str, str, str, str, str, str, str, str]  # (issuer_id, date, last_trade_price, max_price, min_price, avg_price, percent_change, volume, turnover_best, total_turnover)
+NewsArticle = Tuple[str, date, List[str]]  # (title, date, content)
 CompanyData = Tuple[str, str, Optional[str], Optional[str], Optional[str], Optional[str], Optional[str], Optional[str], Optional[List[str]], Optional[List[str]]]  # (code, name, address, city, state, email, website, contact_person, phones, fax)
+RunItemUpdate = Tuple[int, str, str, Optional[str], datetime, datetime]  # (run_id, item_key, state, error, started_at, finished_at)
+
+# SQL twin of news_fingerprint, used to fingerprint rows stored before the column existed
+NEWS_FINGERPRINT_SQL = """
+    encode(sha256(convert_to(title || chr(31) || to_char(date, 'YYYY-MM-DD') || chr(31)
+        || array_to_string(content, chr(30)), 'UTF8')), 'hex')
+"""
+
+# One-off migration giving the news articles stored before fingerprints existed a unique fingerprint
+NEWS_FINGERPRINT_MIGRATION = [
+    """
+    ALTER TABLE News ADD COLUMN IF NOT EXISTS fingerprint CHAR(64);
+    """,
+    f"""
+    UPDATE News SET fingerprint = {NEWS_FINGERPRINT_SQL} WHERE fingerprint IS NULL;
+    """,
+    # Pairs whose every locale repeats an earlier pair are removed whole, so no article loses its translation
+    """
+    DELETE FROM News WHERE shared_id IN (
+        SELECT pair.shared_id FROM News pair
+            LEFT JOIN News original ON original.fingerprint = pair.fingerprint AND original.shared_id < pair.shared_id
+        GROUP BY pair.shared_id
+        HAVING bool_and(original.id IS NOT NULL)
+    );
+    """,
+    # Rows of partly repeated pairs are kept, only without a fingerprint of their own
+    """
+    UPDATE News duplicate SET fingerprint = NULL FROM News original
+    WHERE duplicate.fingerprint = original.fingerprint AND duplicate.id > original.id;
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS news_fingerprint_idx ON News (fingerprint);
+    """
+]
+
+# Batches of at least this many stock entries are loaded with COPY instead of executemany
+COPY_THRESHOLD = 250
+
+STOCK_COLUMNS = ("issuer_id", "date", "last_trade_price", "max_price", "min_price", "avg_price",
+                 "percent_change", "volume", "turnover_best", "total_turnover")
+
+
+def news_fingerprint(title: str, date: date, content: List[str]) -> str:
+    """Hash of the title, date and content of a news article"""
+    text = f"{title}\x1f{date.isoformat()}\x1f" + "\x1e".join(content)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
 class Database:
     """Database interface for scrapers"""
-    def __init__(self, user: str, password: str, database: str, host: str) -> None:
+    def __init__(self, user: str, password: str, database: str, host: str,
+                 min_size: int = 1, max_size: int = 30) -> None:
         self.pool: Optional[Pool] = None
         self.user = user
         self.password = password
         self.database = database
         self.host = host
+        self.min_size = min_size
+        self.max_size = max_size
 
     async def connect(self) -> None:
-        """Create connection pool to database"""
+        """Create connection pool to database, unless it is already open"""
+        if self.pool is not None:
+            return
+
         self.pool = await create_pool(
             user=self.user,
             password=self.password,
             database=self.database,
             host=self.host,
-            min_size=1,
-            max_size=30
+            min_size=self.min_size,
+            max_size=self.max_size
         )
 
     async def close(self) -> None:
@@ -112,16 +168,61 @@ class Database:
                 content TEXT[] NOT NULL,
                 UNIQUE(shared_id, locale)
             );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS news_link (
+                link TEXT PRIMARY KEY,
+                seen_at TIMESTAMP NOT NULL DEFAULT now()
+            );
             """
         ]
 
         async with self.pool.acquire() as conn:
             for query in queries:
                 await conn.execute(query)
+
+        await self.run_migration("news_fingerprint", NEWS_FINGERPRINT_MIGRATION)
+
+    async def run_migration(self, name: str, queries: List[str]) -> None:
+        """Apply a one-off migration in a transaction, unless an earlier start of any scraper applied it"""
+        async with self.pool.acquire() as conn:
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migration (
+                    name VARCHAR(100) PRIMARY KEY,
+                    applied_at TIMESTAMP NOT NULL DEFAULT now()
+                );
+            """)
+
+            async with conn.transaction():
+                # Scrapers starting at the same time wait for the one applying the migration
+                await conn.execute("SELECT pg_advisory_xact_lock(hashtext($1))", name)
+
+                if await conn.fetchval("SELECT 1 FROM schema_migration WHERE name = $1", name):
+                    return
+
+                for query in queries:
+                    await conn.execute(query)
+
+                await conn.execute("INSERT INTO schema_migration (name) VALUES ($1)", name)
                 
+    async def create_issuer_catalog_table(self) -> None:
+        """Create table for issuer metadata taken from the symbol pages if it doesn't exist"""
+        query = """
+            CREATE TABLE IF NOT EXISTS issuer_catalog (
+                code VARCHAR(20) PRIMARY KEY,
+                seinet_id INTEGER,
+                profile_hash CHAR(64) NOT NULL,
+                refreshed_at TIMESTAMP NOT NULL DEFAULT now()
+            );
+        """
+
+        async with self.pool.acquire() as conn:
+            await conn.execute(query)
+
     async def create_issuer_news_table(self) -> None:
         """Create table for issuer news if it doesn't exist"""
-        query = """
+        queries = [
+            """
             CREATE TABLE IF NOT EXISTS issuer_news (
                 id SERIAL PRIMARY KEY,
                 seinet_id INT NOT NULL,
@@ -132,11 +233,141 @@ class Database:
                 FOREIGN KEY (issuer_id) REFERENCES issuer(id),
                 UNIQUE(issuer_id, seinet_id)
             );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS issuer_news_seinet_id_idx ON issuer_news (seinet_id);
+            """
+        ]
+
+        async with self.pool.acquire() as conn:
+            for query in queries:
+                await conn.execute(query)
+
+    async def create_run_journal_tables(self) -> None:
+        """Create the run journal tables and the progress view if they don't exist"""
+        queries = [
+            """
+            CREATE TABLE IF NOT EXISTS scraper_run (
+                id SERIAL PRIMARY KEY,
+                scraper VARCHAR(100) NOT NULL,
+                started_at TIMESTAMP NOT NULL DEFAULT now(),
+                resumed_at TIMESTAMP,
+                finished_at TIMESTAMP
+            );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS scraper_run_unfinished_idx ON scraper_run (scraper) WHERE finished_at IS NULL;
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS scraper_run_item (
+                run_id INTEGER NOT NULL REFERENCES scraper_run(id) ON DELETE CASCADE,
+                item_key TEXT NOT NULL,
+                item BYTEA NOT NULL,
+                state VARCHAR(10) NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP,
+                PRIMARY KEY (run_id, item_key)
+            );
+            """,
+            """
+            DROP VIEW IF EXISTS scraper_run_progress;
+            CREATE VIEW scraper_run_progress AS
+            SELECT r.id AS run_id, r.scraper, r.started_at, r.resumed_at, r.finished_at,
+                COUNT(i.item_key) AS total,
+                COUNT(*) FILTER (WHERE i.state = 'pending') AS pending,
+                COUNT(*) FILTER (WHERE i.state = 'done') AS done,
+                COUNT(*) FILTER (WHERE i.state = 'failed') AS failed,
+                MAX(i.finished_at) AS last_finished_at
+            FROM scraper_run r
+                LEFT JOIN scraper_run_item i ON i.run_id = r.id
+            GROUP BY r.id;
+            """
+        ]
+
+        async with self.pool.acquire() as conn:
+            for query in queries:
+                await conn.execute(query)
+
+    @timed("db_write")
+    async def start_run(self, scraper: str) -> int:
+        """Journal a new run of a scraper"""
+        async with self.pool.acquire() as conn:
+            return await conn.fetchval("INSERT INTO scraper_run (scraper) VALUES ($1) RETURNING id", scraper)
+
+    @timed("db_write")
+    async def add_run_items(self, run_id: int, items: List[Tuple[str, bytes]]) -> None:
+        """Journal items found while a run is already in progress, ignoring ones journaled before"""
+        query = """
+            INSERT INTO scraper_run_item (run_id, item_key, item) VALUES ($1, $2, $3)
+            ON CONFLICT (run_id, item_key) DO NOTHING
         """
 
         async with self.pool.acquire() as conn:
-            await conn.execute(query)
+            await conn.executemany(query, [(run_id, key, item) for key, item in items])
+
+    @timed("db_read")
+    async def get_interrupted_run(self, scraper: str) -> Optional[int]:
+        """Get the latest run of a scraper that never finished"""
+        query = """
+            SELECT id FROM scraper_run WHERE scraper = $1 AND finished_at IS NULL ORDER BY id DESC LIMIT 1
+        """
+
+        async with self.pool.acquire() as conn:
+            return await conn.fetchval(query, scraper)
+
+    @timed("db_write")
+    async def resume_run(self, run_id: int, max_attempts: int) -> List[bytes]:
+        """Mark a run as resumed and get its items that are unfinished or failed fewer than max_attempts times"""
+        query = """
+            SELECT item FROM scraper_run_item
+            WHERE run_id = $1 AND state <> 'done' AND attempts < $2
+            ORDER BY item_key
+        """
+
+        async with self.pool.acquire() as conn:
+            await conn.execute("UPDATE scraper_run SET resumed_at = now() WHERE id = $1", run_id)
+            return [row["item"] for row in await conn.fetch(query, run_id, max_attempts)]
+
+    @timed("db_write")
+    async def mark_run_items(self, updates: List[RunItemUpdate]) -> None:
+        """Record how a batch of journaled items ended, counting an attempt for each of them"""
+        query = """
+            UPDATE scraper_run_item SET
+                state = $3,
+                error = $4,
+                attempts = attempts + 1,
+                started_at = $5,
+                finished_at = $6
+            WHERE run_id = $1 AND item_key = $2
+        """
 
+        async with self.pool.acquire() as conn:
+            await conn.executemany(query, updates)
+
+    @timed("db_write")
+    async def finish_run(self, run_id: int) -> None:
+        """Mark a run as finished so that the next run starts over"""
+        async with self.pool.acquire() as conn:
+            await conn.execute("UPDATE scraper_run SET finished_at = now() WHERE id = $1", run_id)
+
+    @timed("db_write")
+    async def carry_over_failed_items(self, run_id: int, scraper: str, max_attempts: int) -> List[bytes]:
+        """Journal the items the previous run of a scraper failed fewer than max_attempts times under a new run"""
+        query = """
+            INSERT INTO scraper_run_item (run_id, item_key, item, attempts)
+            SELECT $1, item_key, item, attempts FROM scraper_run_item
+            WHERE run_id = (SELECT id FROM scraper_run WHERE scraper = $2 AND id < $1 ORDER BY id DESC LIMIT 1)
+                AND state <> 'done' AND attempts < $3
+            ON CONFLICT (run_id, item_key) DO NOTHING
+            RETURNING item
+        """
+
+        async with self.pool.acquire() as conn:
+            return [row["item"] for row in await conn.fetch(query, run_id, scraper, max_attempts)]
+
+    @timed("db_write")
     async def add_company(self, code: str, name: str, address: Optional[str] = None, 
                          city: Optional[str] = None, state: Optional[str] = None, 
                          email: Optional[str] = None, website: Optional[str] = None, 
@@ -152,6 +383,7 @@ class Database:
         async with self.pool.acquire() as conn:
             return await conn.fetchval(query, code, name, address, city, state, email, website, contact_person, phones, fax)
         
+    @timed("db_write")
     async def add_company_mk(self, code: str, name: str, address: Optional[str] = None, 
                             city: Optional[str] = None, state: Optional[str] = None, 
                             email: Optional[str] = None, website: Optional[str] = None, 
@@ -167,6 +399,7 @@ class Database:
         async with self.pool.acquire() as conn:
             return await conn.fetchval(query, code, name, address, city, state, email, website, contact_person, phones, fax)
 
+    @timed("db_write")
     async def add_issuer(self, code: str, company_id: int) -> int:
         """Add an issuer to the database"""
         query = """
@@ -178,6 +411,7 @@ class Database:
         async with self.pool.acquire() as conn:
             return await conn.fetchval(query, code, company_id)
         
+    @timed("db_write")
     async def update_issuer(self, issuer_id: int, company_mk_id: int) -> None:
         """Update issuer with Macedonian company ID"""
         query = """
@@ -187,6 +421,23 @@ class Database:
         async with self.pool.acquire() as conn:
             await conn.execute(query, issuer_id, company_mk_id)
 
+    @timed("db_write")
+    async def update_company(self, company_data: CompanyData, table: str = "Company") -> None:
+        """Replace the stored profile of a company, found by its code"""
+        code, name, *details = company_data
+        query = f"""
+            UPDATE {table} SET name = $2, address = $3, city = $4, state = $5, email = $6, website = $7,
+                contact_person = $8, phones = $9, fax = $10
+            WHERE code = $1
+        """
+
+        async with self.pool.acquire() as conn:
+            await conn.execute(query, code, name, *details, *[None] * (8 - len(details)))
+
+    async def update_company_mk(self, company_data_mk: CompanyData) -> None:
+        """Replace the stored Macedonian profile of a company"""
+        await self.update_company(company_data_mk, "Company_mk")
+
     async def assign_issuer(self, issuer_code: str, company_data: CompanyData) -> int:
         """Create company and assign it to a new issuer"""
         company_id = await self.add_company(*company_data)
@@ -197,6 +448,7 @@ class Database:
         company_mk_id = await self.add_company_mk(*company_data_mk)
         await self.update_issuer(issuer_id, company_mk_id)
     
+    @timed("db_write")
     async def add_stock_entry(self, issuer_id: int, date: date, last_trade_price: str,
                             max_price: str, min_price: str, avg_price: str, percent_change: str,
                             volume: str, turnover_best: str, total_turnover: str) -> int:
@@ -210,8 +462,15 @@ class Database:
         async with self.pool.acquire() as conn:
             return await conn.fetchval(query, issuer_id, date, last_trade_price, max_price, min_price, avg_price, percent_change, volume, turnover_best, total_turnover)
 
-    async def batch_add_stock_entries(self, entries: List[StockEntry]) -> None:
+    @timed("db_write")
+    async def batch_add_stock_entries(self, entries: List[StockEntry], copy_threshold: int = COPY_THRESHOLD) -> None:
         """Add multiple stock history entries in batch"""
+        metrics.inc("db_rows_written_total", len(entries), table="StockHistory")
+        tracer.annotate(rows=len(entries))
+
+        if len(entries) >= copy_threshold:
+            return await self.copy_stock_entries(entries)
+
         query = """
             INSERT INTO StockHistory (issuer_id, date, last_trade_price, max_price, min_price, avg_price, percent_change, volume, turnover_best, total_turnover)
             VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
@@ -220,7 +479,43 @@ class Database:
 
         async with self.pool.acquire() as conn:
             await conn.executemany(query, entries)
+
+    async def copy_stock_entries(self, entries: List[StockEntry]) -> None:
+        """Bulk load stock history entries with COPY into a staging table and merge them in one statement"""
+        # Temporary tables are never WAL-logged, so the staging copy costs no more than an unlogged table
+        staging_query = """
+            CREATE TEMP TABLE IF NOT EXISTS StockHistory_staging (
+                issuer_id INTEGER NOT NULL,
+                date DATE NOT NULL,
+                last_trade_price VARCHAR(255) NOT NULL,
+                max_price VARCHAR(255) NOT NULL,
+                min_price VARCHAR(255) NOT NULL,
+                avg_price VARCHAR(255) NOT NULL,
+                percent_change VARCHAR(255) NOT NULL,
+                volume VARCHAR(255) NOT NULL,
+                turnover_best VARCHAR(255) NOT NULL,
+                total_turnover VARCHAR(255) NOT NULL
+            ) ON COMMIT DELETE ROWS;
+        """
+
+        merge_query = """
+            INSERT INTO StockHistory (issuer_id, date, last_trade_price, max_price, min_price, avg_price, percent_change, volume, turnover_best, total_turnover)
+            SELECT DISTINCT ON (issuer_id, date) issuer_id, date, last_trade_price, max_price, min_price, avg_price, percent_change, volume, turnover_best, total_turnover
+            FROM StockHistory_staging
+            ON CONFLICT (issuer_id, date) DO NOTHING;
+        """
+
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(staging_query)
+                await conn.copy_records_to_table(
+                    "stockhistory_staging",
+                    records=[tuple(entry) for entry in entries],
+                    columns=STOCK_COLUMNS
+                )
+                await conn.execute(merge_query)
             
+    @timed("db_read")
     async def get_issuers(self) -> List[Tuple[str, int]]:
         """Get list of all issuers with their codes and IDs"""
         query = """
@@ -230,24 +525,69 @@ class Database:
         async with self.pool.acquire() as conn:
             return await conn.fetch(query)
 
-    async def find_issuer_by_code(self, code: str) -> Optional[int]:
-        """Find issuer ID by code"""
-        query = "SELECT id FROM Issuer WHERE code = $1"
+    @timed("db_read")
+    async def get_catalog_entries(self) -> Dict[str, Tuple[Optional[int], str, datetime]]:
+        """Get SEINet ID, profile hash and refresh time of every cataloged issuer, keyed by code"""
+        query = """
+            SELECT code, seinet_id, profile_hash, refreshed_at FROM issuer_catalog
+        """
 
         async with self.pool.acquire() as conn:
-            return await conn.fetchval(query, code)
+            rows = await conn.fetch(query)
 
-    async def get_last_available_issuer_date(self, code: str) -> Optional[date]:
-        """Get most recent date in stock history for an issuer"""
-        issuer_id = await self.find_issuer_by_code(code)
-        if not issuer_id:
-            return None
+        return {row["code"]: (row["seinet_id"], row["profile_hash"], row["refreshed_at"]) for row in rows}
 
-        query = "SELECT MAX(date) FROM StockHistory WHERE issuer_id = $1"
+    @timed("db_write")
+    async def upsert_catalog_entry(self, code: str, seinet_id: Optional[int], profile_hash: str) -> None:
+        """Store a refreshed catalog entry"""
+        query = """
+            INSERT INTO issuer_catalog (code, seinet_id, profile_hash, refreshed_at)
+            VALUES ($1, $2, $3, now())
+            ON CONFLICT (code) DO UPDATE SET
+                seinet_id = EXCLUDED.seinet_id,
+                profile_hash = EXCLUDED.profile_hash,
+                refreshed_at = EXCLUDED.refreshed_at
+        """
 
         async with self.pool.acquire() as conn:
-            return await conn.fetchval(query, issuer_id)
-        
+            await conn.execute(query, code, seinet_id, profile_hash)
+
+    @timed("db_read")
+    async def get_cataloged_issuers(self) -> List[Tuple[str, int, Optional[int], Optional[datetime]]]:
+        """Get code, ID, SEINet ID and catalog refresh time of every issuer, the last two empty when not cataloged"""
+        query = """
+            SELECT i.code, i.id, c.seinet_id, c.refreshed_at
+            FROM Issuer i
+                LEFT JOIN issuer_catalog c ON c.code = i.code
+        """
+
+        async with self.pool.acquire() as conn:
+            return await conn.fetch(query)
+
+    @timed("db_read")
+    async def get_issuer_watermarks(self) -> Dict[str, Tuple[int, Optional[date]]]:
+        """Get issuer ID and most recent stock history date for every issuer, keyed by code"""
+        query = """
+            SELECT i.code, i.id, MAX(s.date) AS last_date
+            FROM Issuer i
+                LEFT JOIN StockHistory s ON s.issuer_id = i.id
+            GROUP BY i.code, i.id
+        """
+
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query)
+
+        return {row["code"]: (row["id"], row["last_date"]) for row in rows}
+
+    @timed("db_read")
+    async def get_trading_dates(self, since: date) -> List[date]:
+        """Get every date since the given one that has stock history for any issuer"""
+        query = "SELECT DISTINCT date FROM StockHistory WHERE date >= $1"
+
+        async with self.pool.acquire() as conn:
+            return [row["date"] for row in await conn.fetch(query, since)]
+
+    @timed("db_read")
     async def get_last_available_issuer_news_date(self, issuer_id: int) -> Optional[date]:
         """Get most recent date in news for an issuer"""
         query = """
@@ -257,6 +597,7 @@ class Database:
         async with self.pool.acquire() as conn:
             return await conn.fetchval(query, issuer_id)
         
+    @timed("db_read")
     async def get_last_available_news_date(self) -> Optional[date]:
         """Get most recent date in general news"""
         query = "SELECT MAX(date) FROM News"
@@ -264,49 +605,71 @@ class Database:
         async with self.pool.acquire() as conn:
             return await conn.fetchval(query)
         
-    async def add_news(self, title: str, date: date, content: List[str], locale: str) -> int:
-        """Add news article"""
+    @timed("db_write")
+    async def add_news_pair(self, news_en: NewsArticle, news_mk: NewsArticle) -> bool:
+        """Add the English and Macedonian versions of an article together, unless either is already stored"""
         query = """
-            INSERT INTO News (title, date, content, locale)
-            VALUES ($1, $2, $3, $4)
-            ON CONFLICT (shared_id, locale) DO UPDATE SET
-                date = EXCLUDED.date,
-                content = EXCLUDED.content
+            WITH pair AS (
+                SELECT nextval('news_shared_id_seq') AS shared_id
+                WHERE NOT EXISTS (SELECT 1 FROM News WHERE fingerprint IN ($4, $8))
+            )
+            INSERT INTO News (shared_id, locale, title, date, content, fingerprint)
+            SELECT pair.shared_id, article.locale, article.title, article.date, article.content, article.fingerprint
+            FROM pair, (VALUES
+                ('en', $1::varchar, $2::date, $3::text[], $4::char(64)),
+                ('mk', $5::varchar, $6::date, $7::text[], $8::char(64))
+            ) AS article (locale, title, date, content, fingerprint)
+            ON CONFLICT DO NOTHING
             RETURNING shared_id
         """
 
+        fingerprints = sorted({news_fingerprint(*news_en), news_fingerprint(*news_mk)})
+
         async with self.pool.acquire() as conn:
-            return await conn.fetchval(query, title, date, content, locale)
+            transaction = conn.transaction()
+            await transaction.start()
 
-    async def add_news_mk(self, shared_id: int, title: str, date: date, content: List[str]) -> None:
-        """Add Macedonian news article"""
-        query = """
-            INSERT INTO News (shared_id, title, date, content, locale)
-            VALUES ($1, $2, $3, $4, 'mk')
-            ON CONFLICT (shared_id, locale) DO NOTHING
-        """
+            try:
+                # Workers storing the same article wait for each other instead of both passing the fingerprint check
+                for fingerprint in fingerprints:
+                    await conn.execute("SELECT pg_advisory_xact_lock(hashtext($1))", fingerprint)
 
-        async with self.pool.acquire() as conn:
-            await conn.execute(query, shared_id, title, date, content)
-            
-    async def get_news(self, title: str, date: date, content: List[str]) -> List[Any]:
-        """Get news article by content"""
+                rows = await conn.fetch(query, *news_en, news_fingerprint(*news_en), *news_mk, news_fingerprint(*news_mk))
+            except BaseException:
+                await transaction.rollback()
+                raise
+
+            # Never keep a pair with only one of its versions
+            if len(rows) == 1:
+                await transaction.rollback()
+                return False
+
+            await transaction.commit()
+
+        return bool(rows)
+
+    @timed("db_read")
+    async def get_seen_news_links(self, links: List[str]) -> Set[str]:
+        """Get which of the listed news links were processed by an earlier run"""
         query = """
-            SELECT * FROM News WHERE title = $1 AND date = $2 AND content = $3
+            SELECT link FROM news_link WHERE link = ANY($1::text[])
         """
 
         async with self.pool.acquire() as conn:
-            return await conn.fetch(query, title, date, content)
+            return {row["link"] for row in await conn.fetch(query, links)}
 
-    async def get_news_mk(self, title: str, date: date, content: List[str]) -> List[Any]:
-        """Get Macedonian news article by content"""
+    @timed("db_write")
+    async def add_news_link(self, link: str) -> None:
+        """Remember a processed news link, moving the watermark of the listing crawl"""
         query = """
-            SELECT * FROM News WHERE title = $1 AND date = $2 AND content = $3 AND locale = 'mk'
+            INSERT INTO news_link (link) VALUES ($1)
+            ON CONFLICT (link) DO UPDATE SET seen_at = now()
         """
 
         async with self.pool.acquire() as conn:
-            return await conn.fetch(query, title, date, content)
+            await conn.execute(query, link)
 
+    @timed("db_write")
     async def add_issuer_news(self, issuer_id: int, seinet_id: int, content: str, date: date, attachments: List[str]) -> None:
         """Add issuer-specific news article"""
         query = """
@@ -319,13 +682,17 @@ class Database:
             async with self.pool.acquire() as conn:
                 await conn.execute(query, issuer_id, seinet_id, content, date, attachments)
         except Exception as e:
-            print(content, date, attachments)
+            tracer.annotate(error=repr(e), seinet_id=seinet_id)
+            print(f"Failed to add issuer news {seinet_id} of issuer {issuer_id} from {date}: {e}")
     
-    async def get_issuer_news_id(self, seinet_id: int) -> Optional[int]:
-        """Get issuer news ID by seinet ID"""
+    @timed("db_read")
+    async def get_missing_issuer_news_ids(self, seinet_ids: List[int]) -> List[int]:
+        """Get which of the given SEINet document IDs are not stored yet, keeping their order"""
         query = """
-            SELECT id FROM issuer_news WHERE seinet_id = $1
+            SELECT seinet_id FROM issuer_news WHERE seinet_id = ANY($1::int[])
         """
 
         async with self.pool.acquire() as conn:
-            return await conn.fetchval(query, seinet_id)
+            stored = {row["seinet_id"] for row in await conn.fetch(query, seinet_ids)}
+
+        return [seinet_id for seinet_id in seinet_ids if seinet_id not in stored]
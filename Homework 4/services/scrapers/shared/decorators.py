@@ -1,10 +1,11 @@
 import os
 import time
-import asyncio
-from typing import List, Type
-from multiprocessing import Pool
+from typing import AsyncIterator, List, Optional
+from aiohttp import web
 from .base_scraper import BaseScraper, T, R
-from .database import Database
+from .concurrency import process_concurrently
+from .worker_pool import WorkerPool
+from .metrics import export_metrics, metrics, start_metrics_server
 
 
 class ScraperDecorator(BaseScraper[T, R]):
@@ -13,9 +14,14 @@ class ScraperDecorator(BaseScraper[T, R]):
         self._scraper = scraper
         self.db = scraper.db
         self.db_params = scraper.db_params
+        self.http = scraper.http
+        self.http_params = scraper.http_params
         self.is_decorated = isinstance(scraper, ScraperDecorator)
         self.original_class = scraper.__class__ if not self.is_decorated else scraper.original_class
 
+    async def connect_http(self) -> None:
+        return await self._scraper.connect_http()
+
     async def connect_db(self) -> None:
         return await self._scraper.connect_db()
     
@@ -34,57 +40,169 @@ class ScraperDecorator(BaseScraper[T, R]):
     async def process_item(self, item: T) -> None:
         return await self._scraper.process_item(item)
 
-    async def execute_scraping(self) -> None:
-        return await self._scraper.execute_scraping()
+    async def run_once(self) -> None:
+        return await self._scraper.run_once()
+
+    async def cleanup(self) -> None:
+        return await self._scraper.cleanup()
+
+    @property
+    def scraper_name(self) -> str:
+        return self.original_class.__name__
+
+    @property
+    def run_id(self) -> Optional[int]:
+        return self._scraper.run_id
+
+    def item_key(self, item: T) -> str:
+        return self._scraper.item_key(item)
+
+    async def refresh_items(self, items: List[T]) -> List[T]:
+        return await self._scraper.refresh_items(items)
+
+    async def iter_items(self) -> AsyncIterator[List[T]]:
+        async for batch in self._scraper.iter_items():
+            yield batch
+
+    async def start_run(self) -> List[T]:
+        return await self._scraper.start_run()
+
+    async def stream_run(self) -> AsyncIterator[T]:
+        async for item in self._scraper.stream_run():
+            yield item
+
+    async def execute_item(self, item: T) -> None:
+        return await self._scraper.execute_item(item)
+
+    async def flush_journal(self) -> None:
+        return await self._scraper.flush_journal()
+
+    async def finish_run(self) -> None:
+        return await self._scraper.finish_run()
 
 
 class MultiProcessScraper(ScraperDecorator[T, R]):
     """Decorator that adds multiprocessing capability to scrapers"""
-    def __init__(self, scraper: BaseScraper[T, R], process_count: int = os.cpu_count() or 1) -> None:
+    def __init__(self, scraper: BaseScraper[T, R], process_count: int = os.cpu_count() or 1,
+                 batch_size: int = 8, concurrency: int = 4) -> None:
         super().__init__(scraper)
         self.process_count = process_count
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.pool: Optional[WorkerPool] = None  # Kept between the runs of a daemon
         
-    async def execute_scraping(self) -> None:
-        await self.connect_db()
-        items = await self.fetch_items()
+    async def run_once(self) -> None:
+        items = await self.start_run()
         await self.process_data(items)
-        await self.cleanup()
+        await self.finish_run()
         
     async def process_data(self, items: List[T]) -> None:
-        """Process items in parallel using multiple processes"""
-        with Pool(processes=self.process_count) as pool:
-            pool.starmap(process_item_worker, [(self.original_class, item, self.db_params) for item in items])
-            
+        """Process items in parallel using a pool of persistent worker processes"""
+        if not items:
+            return
+
+        batch_count = -(-len(items) // self.batch_size)
+        process_count = min(self.process_count, batch_count)
+
+        # A pool sized by a small earlier run, such as a resumed one, is replaced when a run needs more workers
+        if self.pool is not None and self.pool.process_count < process_count:
+            self.pool.stop()
+            self.pool = None
+
+        if self.pool is None:
+            self.pool = WorkerPool(self.original_class, self.db_params, self.http_params, self.http.rate_limits,
+                                   process_count, self.concurrency)
+            self.pool.start()
+
+        try:
+            processed, failed = await self.pool.map(items, self.batch_size, self.run_id)
+        except BaseException:
+            # Queued batches and dead workers must not leak into the next run of a daemon
+            self.pool.stop()
+            self.pool = None
+            raise
+
+        print(f"Processed {processed} items ({failed} failed)")
+
+    async def cleanup(self) -> None:
+        if self.pool is not None:
+            self.pool.stop()
+            self.pool = None
+
+        await super().cleanup()
+
+
+class ConcurrentScraper(ScraperDecorator[T, R]):
+    """Decorator that processes many items at once in a single event loop"""
+    def __init__(self, scraper: BaseScraper[T, R], concurrency: int = 32, item_timeout: Optional[float] = 600) -> None:
+        super().__init__(scraper)
+        self.concurrency = concurrency
+        self.item_timeout = item_timeout
+
+    async def run_once(self) -> None:
+        await self.process_stream(self.stream_run())
+        await self.finish_run()
+
+    async def process_data(self, items: List[T]) -> None:
+        """Process items concurrently, isolating failures and timeouts of single items"""
+        failed = await process_concurrently(self._scraper.execute_item, items, self.concurrency, self.item_timeout)
+        print(f"Processed {len(items)} items ({failed} failed)")
+
+    async def process_stream(self, items: AsyncIterator[T]) -> None:
+        """Start processing items while the rest of them are still being found"""
+        found = 0
+
+        async def count(items: AsyncIterator[T]) -> AsyncIterator[T]:
+            nonlocal found
+
+            async for item in items:
+                found += 1
+                yield item
+
+        failed = await process_concurrently(self._scraper.execute_item, count(items), self.concurrency,
+                                            self.item_timeout)
+        print(f"Processed {found} items ({failed} failed)")
+
 
 class LoggerScraper(ScraperDecorator[T, R]):
-    """Decorator that adds logging capability to scrapers"""
-    def __init__(self, scraper: BaseScraper[T, R]) -> None:
+    """Decorator that adds logging and per-stage metrics to scrapers"""
+    def __init__(self, scraper: BaseScraper[T, R], metrics_port: Optional[int] = None,
+                 metrics_file: Optional[str] = None) -> None:
         super().__init__(scraper)
+        self.metrics_port = metrics_port or int(os.getenv("METRICS_PORT", "0")) or None
+        self.metrics_file = metrics_file or os.getenv("METRICS_FILE")
+        self.metrics_server: Optional[web.AppRunner] = None  # Lives as long as the process, not one run
+        metrics.set_labels(component=self.original_class.__name__)
+
+    async def connect(self) -> None:
+        await super().connect()
+
+        if self.metrics_port and self.metrics_server is None:
+            self.metrics_server = await start_metrics_server(self.metrics_port)
         
-    async def execute_scraping(self) -> None:
+    async def run_once(self) -> None:
         start_time = time.time()
         print(f"Starting scraping at {time.strftime('%Y-%m-%d %H:%M:%S')}")
         
         try:
-            await self._scraper.execute_scraping()
+            await self._scraper.run_once()
         finally:
             end_time = time.time()
             duration = end_time - start_time
             print(f"Completed scraping at {time.strftime('%Y-%m-%d %H:%M:%S')}")
             print(f"Total execution time: {duration:.2f} seconds")
-            
-
-def process_item_worker(scraper_class: Type[BaseScraper[T, R]], item: T, db_params: dict[str, str]) -> None:
-    """Worker function to process a single item"""
-    async def process() -> None:
-        db = Database(**db_params)
-        await db.connect()
-            
+
+            for line in self.http.rate_limits.report():
+                print(f"Rate limit {line}")
+
+            metrics.inc("run_duration_seconds_total", duration)
+            export_metrics(self.metrics_file)
+
+    async def cleanup(self) -> None:
         try:
-            scraper = scraper_class(db_params)
-            scraper.db = db
-            await scraper.process_item(item)
+            await super().cleanup()
         finally:
-            await db.close()
-
-    asyncio.run(process())
\ No newline at end of file
+            if self.metrics_server is not None:
+                await self.metrics_server.cleanup()
+                self.metrics_server = None
+                metrics.served = False
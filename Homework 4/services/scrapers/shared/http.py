@@ -0,0 +1,252 @@
+import json
+import asyncio
+from urllib.parse import urlsplit
+from typing import Any, BinaryIO, Dict, Mapping, Optional
+from aiohttp import ClientError, ClientResponse, ClientSession, ClientTimeout, TCPConnector
+from multidict import CIMultiDict
+from .cache import CacheEntry, ResponseCache
+from .metrics import STAGE_SECONDS, metrics
+from .rate_limiter import DEFAULT_RATE_LIMITS, RateLimits
+from .retry import CacheMissError, CircuitBreakers, CircuitOpenError, HttpError, RetryPolicy
+
+
+# Size of the chunks streamed responses are written to their sink in
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+class HttpResponse:
+    """Fully read HTTP response returned by HttpSession"""
+    def __init__(self, url: str, status: int, headers: Mapping[str, str], body: bytes, encoding: str,
+                 attempts: int = 1) -> None:
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.encoding = encoding
+        self.attempts = attempts
+
+    def text(self) -> str:
+        """Decode the response body"""
+        return self.body.decode(self.encoding, errors="replace")
+
+    def json(self) -> Any:
+        """Decode the response body as JSON"""
+        return json.loads(self.body)
+
+    @classmethod
+    def from_cache(cls, entry: CacheEntry) -> "HttpResponse":
+        metadata = entry.metadata
+        return cls(metadata["url"], metadata["status"], CIMultiDict(metadata["headers"]), entry.body,
+                   metadata["encoding"], 0)
+
+
+class HttpSession:
+    """Keep-alive HTTP session shared by every request of a scraper run"""
+    def __init__(self, limit: int = 100, limit_per_host: int = 10, dns_ttl: int = 300,
+                 keepalive_timeout: float = 30, timeout: float = 60, connect_timeout: float = 10,
+                 rate_limits: Optional[Dict[str, float]] = None, max_attempts: int = 5, backoff_base: float = 0.5,
+                 backoff_max: float = 30, breaker_threshold: int = 5, breaker_reset: float = 30,
+                 cache_dir: Optional[str] = None, cache_ttl: float = 7 * 24 * 3600,
+                 cache_max_bytes: int = 512 * 1024 * 1024, cache_all: bool = False, offline: bool = False) -> None:
+        self.session: Optional[ClientSession] = None
+        self.cache = ResponseCache(cache_dir, cache_ttl, cache_max_bytes) if cache_dir else None
+        self.cache_all = cache_all
+        self.offline = offline
+        self.rate_limits = RateLimits(DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits)
+        self.retry_policy = RetryPolicy(max_attempts, backoff_base, backoff_max)
+        self.circuit_breakers = CircuitBreakers(breaker_threshold, breaker_reset)
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+
+    async def open(self) -> None:
+        """Create the underlying connection pool"""
+        if self.session is not None:
+            return
+
+        connector = TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_ttl,
+            keepalive_timeout=self.keepalive_timeout
+        )
+
+        self.session = ClientSession(
+            connector=connector,
+            timeout=ClientTimeout(total=self.timeout, sock_connect=self.connect_timeout)
+        )
+
+    async def close(self) -> None:
+        """Close the underlying connection pool"""
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def request(self, method: str, url: str, cache: bool = False, **kwargs: Any) -> HttpResponse:
+        """Send a request, serving it from the response cache when allowed"""
+        if self.offline and self.cache is None:
+            raise HttpError(url, "Offline mode requires a response cache")
+
+        if self.cache is None or not (cache or self.cache_all or self.offline):
+            return await self._fetch(method, url, **kwargs)
+
+        key = self.cache.key(method, url, kwargs.get("json"))
+        entry = self.cache.get(key)
+
+        host = urlsplit(url).hostname or ""
+
+        if self.offline:
+            if entry is None:
+                raise CacheMissError(url, "Response is not in the offline cache")
+            metrics.inc("http_cache_hits_total", host=host)
+            return HttpResponse.from_cache(entry)
+
+        # Responses cached only because of cache_all are always revalidated
+        if entry and cache and self.cache.is_fresh(entry):
+            metrics.inc("http_cache_hits_total", host=host)
+            return HttpResponse.from_cache(entry)
+
+        headers = {**kwargs.pop("headers", {}), **(entry.validators() if entry else {})}
+        response = await self._fetch(method, url, headers=headers, **kwargs)
+
+        if response.status == 304 and entry:
+            metrics.inc("http_cache_revalidations_total", host=host)
+            self.cache.touch(key, entry)
+            return HttpResponse.from_cache(entry)
+
+        if response.status == 200:
+            self.cache.put(key, response.url, response.status, response.headers, response.body, response.encoding)
+
+        return response
+
+    async def _fetch(self, method: str, url: str, sink: Optional[BinaryIO] = None, max_bytes: Optional[int] = None,
+                     **kwargs: Any) -> HttpResponse:
+        """Send a request, retrying failures with backoff, and read the whole response body or stream it to a sink"""
+        await self.open()
+
+        host = urlsplit(url).hostname or ""
+        breaker = self.circuit_breakers.for_host(host)
+        max_attempts = self.retry_policy.max_attempts
+
+        for attempt in range(1, max_attempts + 1):
+            trial = breaker.opened_at is not None  # Only the single half-open trial gets through an opened breaker
+
+            if not breaker.allow():
+                raise CircuitOpenError(url, f"Circuit breaker for {host} is open")
+
+            try:
+                response = await self._send(method, url, attempt, sink, max_bytes, **kwargs)
+            except (ClientError, asyncio.TimeoutError) as e:
+                breaker.record_failure()
+
+                if attempt == max_attempts:
+                    raise HttpError(url, f"Request failed after {attempt} attempts: {e!r}") from e
+
+                metrics.inc("http_retries_total", host=host)
+                await asyncio.sleep(self.retry_policy.delay(attempt))
+                continue
+            except BaseException:
+                if trial:
+                    breaker.release()  # Oversized bodies and cancellations say nothing about the host
+                raise
+
+            if not self.retry_policy.should_retry(response.status):
+                breaker.record_success()
+                return response
+
+            breaker.record_failure()
+
+            if attempt == max_attempts:
+                return response  # Callers decide what a failed status means for them
+
+            metrics.inc("http_retries_total", host=host)
+            await asyncio.sleep(self.retry_policy.delay(attempt, response.headers))
+
+    async def _send(self, method: str, url: str, attempt: int, sink: Optional[BinaryIO] = None,
+                    max_bytes: Optional[int] = None, **kwargs: Any) -> HttpResponse:
+        host = urlsplit(url).hostname or ""
+
+        if limiter := self.rate_limits.for_url(url):
+            metrics.observe(STAGE_SECONDS, await limiter.acquire(), stage="rate_limit_wait", host=host)
+
+        with metrics.time("http_fetch", host=host) as span:
+            async with self.session.request(method, url, **kwargs) as response:
+                if sink is None:
+                    body = await response.read()
+                    size = len(body)
+                    encoding = response.get_encoding()
+                else:
+                    body, size = await self._stream(url, response, sink, max_bytes)
+                    encoding = response.charset or "utf-8"  # Sniffing the encoding needs the body in memory
+
+            span.set(url=url, status=response.status, bytes=size, attempt=attempt)
+
+        metrics.inc("http_requests_total", host=host, status=response.status)
+        metrics.inc("http_response_bytes_total", size, host=host)
+        # Header names are case-insensitive, and HTTP/2 and many proxies send them in lowercase
+        headers = CIMultiDict(response.headers)
+        return HttpResponse(str(response.url), response.status, headers, body, encoding, attempt)
+
+    async def _stream(self, url: str, response: ClientResponse, sink: BinaryIO,
+                      max_bytes: Optional[int]) -> tuple[bytes, int]:
+        """Write the response body to the sink chunk by chunk, starting over on every attempt"""
+        sink.seek(0)
+        sink.truncate()
+        size = 0
+
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_BYTES):
+            size += len(chunk)
+
+            if max_bytes is not None and size > max_bytes:
+                raise HttpError(url, f"Response is larger than {max_bytes} bytes", response.status)
+
+            sink.write(chunk)
+
+        return b"", size
+
+    async def download(self, url: str, sink: BinaryIO, max_bytes: Optional[int] = None, cache: bool = False,
+                       **kwargs: Any) -> HttpResponse:
+        """Stream a response body into a file instead of memory; the returned response has an empty body"""
+        if self.offline and self.cache is None:
+            raise HttpError(url, "Offline mode requires a response cache")
+
+        if self.cache is None or not (cache or self.cache_all or self.offline):
+            return await self._fetch("GET", url, sink=sink, max_bytes=max_bytes, **kwargs)
+
+        key = self.cache.key("GET", url)
+
+        if self.offline:
+            entry = self.cache.get(key)
+
+            if entry is None:
+                raise CacheMissError(url, "Response is not in the offline cache")
+
+            if max_bytes is not None and len(entry.body) > max_bytes:
+                raise HttpError(url, f"Response is larger than {max_bytes} bytes", entry.metadata["status"])
+
+            metrics.inc("http_cache_hits_total", host=urlsplit(url).hostname or "")
+            sink.seek(0)
+            sink.truncate()
+            sink.write(entry.body)
+            response = HttpResponse.from_cache(entry)
+            response.body = b""
+            return response
+
+        # Downloads are not revalidated, they are only recorded for offline runs
+        response = await self._fetch("GET", url, sink=sink, max_bytes=max_bytes, **kwargs)
+
+        if response.status == 200:
+            sink.seek(0)
+            self.cache.put(key, response.url, response.status, response.headers, sink.read(), response.encoding)
+
+        return response
+
+    async def get(self, url: str, cache: bool = False, **kwargs: Any) -> HttpResponse:
+        return await self.request("GET", url, cache, **kwargs)
+
+    async def post(self, url: str, json: Optional[Dict[str, Any]] = None, cache: bool = False,
+                   **kwargs: Any) -> HttpResponse:
+        return await self.request("POST", url, cache, json=json, **kwargs)
@@ -0,0 +1,222 @@
+import os
+import time
+import functools
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+from aiohttp import web
+from .tracing import Span, tracer
+
+# Type aliases
+Labels = Tuple[Tuple[str, str], ...]  # Sorted (name, value) pairs
+MetricKey = Tuple[str, Labels]  # (metric name, labels)
+Snapshot = Dict[str, List[Any]]  # Picklable registry contents, sent from worker processes to the parent
+
+F = TypeVar('F', bound=Callable[..., Awaitable[Any]])
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+STAGE_SECONDS = "stage_duration_seconds"
+STAGE_ERRORS = "stage_errors_total"
+
+
+class Histogram:
+    """Latency histogram with fixed buckets"""
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # Last bucket is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS) if value <= bound), len(LATENCY_BUCKETS))
+        self.buckets[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, buckets: List[int], total: float, count: int) -> None:
+        self.buckets = [mine + theirs for mine, theirs in zip(self.buckets, buckets)]
+        self.sum += total
+        self.count += count
+
+
+class Metrics:
+    """Per-process registry of counters and stage latency histograms"""
+    def __init__(self) -> None:
+        self.labels: Dict[str, str] = {}
+        self.counters: Dict[MetricKey, float] = {}
+        self.histograms: Dict[MetricKey, Histogram] = {}
+        self.served = False  # Whether something in this process already serves /metrics
+
+    def set_labels(self, **labels: str) -> None:
+        """Labels added to every metric recorded from now on, such as the scraper name"""
+        self.labels.update(labels)
+
+    def _key(self, name: str, labels: Dict[str, Any]) -> MetricKey:
+        merged = {**self.labels, **{label: str(value) for label, value in labels.items()}}
+        return name, tuple(sorted(merged.items()))
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = self._key(name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = self._key(name, labels)
+
+        if key not in self.histograms:
+            self.histograms[key] = Histogram()
+
+        self.histograms[key].observe(value)
+
+    @contextmanager
+    def time(self, stage: str, **labels: Any) -> Iterator[Span]:
+        """Record how long a block of a stage (http_fetch, parse, db_read, db_write, ...) took, tracing it as a span"""
+        start = time.perf_counter()
+
+        with tracer.span(stage, **{**self.labels, **labels}) as span:
+            try:
+                yield span
+            except BaseException:
+                self.inc(STAGE_ERRORS, stage=stage, **labels)
+                raise
+            finally:
+                self.observe(STAGE_SECONDS, time.perf_counter() - start, stage=stage, **labels)
+
+    def snapshot(self) -> Snapshot:
+        return {
+            "counters": [(name, labels, value) for (name, labels), value in self.counters.items()],
+            "histograms": [
+                (name, labels, histogram.buckets, histogram.sum, histogram.count)
+                for (name, labels), histogram in self.histograms.items()
+            ]
+        }
+
+    def drain(self) -> Snapshot:
+        """Snapshot of everything recorded since the last drain, clearing the registry"""
+        snapshot = self.snapshot()
+        self.counters.clear()
+        self.histograms.clear()
+        return snapshot
+
+    def merge(self, snapshot: Snapshot) -> None:
+        """Add the metrics recorded by another process"""
+        for name, labels, value in snapshot["counters"]:
+            key = (name, tuple(map(tuple, labels)))
+            self.counters[key] = self.counters.get(key, 0) + value
+
+        for name, labels, buckets, total, count in snapshot["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+
+            self.histograms[key].merge(buckets, total, count)
+
+    def render(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+
+        for name in sorted({name for name, _ in self.counters}):
+            lines.append(f"# TYPE {name} counter")
+
+            for (metric, labels), value in sorted(self.counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{format_labels(labels)} {value:g}")
+
+        for name in sorted({name for name, _ in self.histograms}):
+            lines.append(f"# TYPE {name} histogram")
+
+            for (metric, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                if metric != name:
+                    continue
+
+                cumulative = 0
+
+                for bound, count in zip([*map(str, LATENCY_BUCKETS), "+Inf"], histogram.buckets):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', bound),))} {cumulative}")
+
+                lines.append(f"{name}_sum{format_labels(labels)} {histogram.sum:.6f}")
+                lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        """Write the metrics for the node exporter textfile collector, replacing the file atomically"""
+        with open(f"{path}.{os.getpid()}.tmp", "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(f"{path}.{os.getpid()}.tmp", path)
+
+    def summary(self) -> List[str]:
+        """Human readable time spent per stage and host or operation, slowest first"""
+        totals: Dict[str, Histogram] = {}
+
+        for (name, labels), histogram in self.histograms.items():
+            if name != STAGE_SECONDS:
+                continue
+
+            label_map = dict(labels)
+            detail = label_map.get("host") or label_map.get("operation")
+            stage = label_map.get("stage", "") + (f" {detail}" if detail else "")
+
+            if stage not in totals:
+                totals[stage] = Histogram()
+
+            totals[stage].merge(histogram.buckets, histogram.sum, histogram.count)
+
+        return [
+            f"{stage}: {histogram.count} calls, {histogram.sum:.2f}s total, "
+            f"{histogram.sum / histogram.count * 1000:.1f} ms avg"
+            for stage, histogram in sorted(totals.items(), key=lambda item: -item[1].sum)
+            if histogram.count
+        ]
+
+
+def format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+
+def timed(stage: str) -> Callable[[F], F]:
+    """Decorator recording every call of an async method as a stage, labelled with the method name"""
+    def decorator(function: F) -> F:
+        @functools.wraps(function)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with metrics.time(stage, operation=function.__name__):
+                return await function(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+async def start_metrics_server(port: int) -> Optional[web.AppRunner]:
+    """Serve the registry on /metrics for Prometheus to scrape, unless this process already serves it"""
+    if metrics.served:
+        return None
+
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", port).start()
+    metrics.served = True
+    return runner
+
+
+def export_metrics(file_path: Optional[str] = None) -> None:
+    """Print the per-stage summary and write the textfile when a path is configured"""
+    for line in metrics.summary():
+        print(f"Stage {line}")
+
+    if file_path:
+        metrics.write_textfile(file_path)
+
+
+# Registry of the current process; worker processes send theirs to the parent with every batch result
+metrics = Metrics()
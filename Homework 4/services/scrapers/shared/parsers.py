@@ -0,0 +1,109 @@
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple, Type
+import lxml.html
+from lxml import etree
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Type aliases
+TableRows = List[List[str]]  # Stripped text of every cell of every table body row
+Article = Tuple[Optional[str], Optional[str], List[str]]  # (title, date, paragraphs)
+
+
+def has_class(name: str) -> str:
+    """XPath predicate equivalent to the CSS class selector .name"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class HtmlParser(ABC):
+    """Extractors for the MSE pages, implemented by interchangeable parser backends"""
+    name: str
+
+    @abstractmethod
+    def table_rows(self, html: str) -> TableRows:
+        """Cell texts of all rows inside the page's tbody elements"""
+        pass
+
+    @abstractmethod
+    def news_article(self, html: str) -> Article:
+        """Title, date and paragraphs of a news article page"""
+        pass
+
+
+class LxmlParser(HtmlParser):
+    """Fast backend using lxml.html and precompiled XPath expressions"""
+    name = "lxml"
+
+    rows_xpath = etree.XPath("//tbody//tr")
+    cells_xpath = etree.XPath(".//td")
+    title_xpath = etree.XPath(f"//main/descendant-or-self::*[{has_class('col-md-9')}]")
+    date_xpath = etree.XPath(f"//main/descendant-or-self::*[{has_class('news-date')}]")
+    paragraphs_xpath = etree.XPath("//main/descendant-or-self::*[@id='content']/p")
+
+    @staticmethod
+    def _document(html: str) -> Optional[lxml.html.HtmlElement]:
+        if not html.strip():
+            return None
+
+        return lxml.html.document_fromstring(html)
+
+    def table_rows(self, html: str) -> TableRows:
+        document = self._document(html)
+
+        if document is None:
+            return []
+
+        return [
+            [cell.text_content().strip() for cell in self.cells_xpath(row)]
+            for row in self.rows_xpath(document)
+        ]
+
+    def news_article(self, html: str) -> Article:
+        document = self._document(html)
+
+        if document is None:
+            return None, None, []
+
+        titles = self.title_xpath(document)
+        dates = self.date_xpath(document)
+        title = titles[0].text_content().strip() if titles else None
+        date = dates[0].text_content().strip() if dates else None
+        content = [p.text_content().strip() for p in self.paragraphs_xpath(document)]
+        return title, date, content
+
+
+class SoupParser(HtmlParser):
+    """BeautifulSoup backend kept as a fallback"""
+    name = "soup"
+
+    def table_rows(self, html: str) -> TableRows:
+        soup = BeautifulSoup(html, "lxml", parse_only=SoupStrainer("tbody"))
+        return [[col.text.strip() for col in row.select("td")] for row in soup.select("tbody tr")]
+
+    def news_article(self, html: str) -> Article:
+        soup = BeautifulSoup(html, "lxml", parse_only=SoupStrainer("main"))
+        title = soup.select_one(".col-md-9").text.strip() if soup.select_one(".col-md-9") else None
+        date = soup.select_one(".news-date").text.strip() if soup.select_one(".news-date") else None
+        content = [p.text.strip() for p in soup.select("#content > p")]
+        return title, date, content
+
+
+PARSERS: Dict[str, Type[HtmlParser]] = {
+    LxmlParser.name: LxmlParser,
+    SoupParser.name: SoupParser
+}
+
+_default_parser: Optional[HtmlParser] = None
+
+
+def get_parser(name: Optional[str] = None) -> HtmlParser:
+    """Parser backend by name, defaulting to the HTML_PARSER environment variable"""
+    global _default_parser
+
+    if name is not None:
+        return PARSERS[name]()
+
+    if _default_parser is None:
+        _default_parser = PARSERS[os.getenv("HTML_PARSER", LxmlParser.name)]()
+
+    return _default_parser
@@ -0,0 +1,93 @@
+import time
+import asyncio
+import multiprocessing
+from urllib.parse import urlsplit
+from typing import Dict, List, Optional
+
+# Default request budget in requests per second for every upstream host
+DEFAULT_RATE_LIMITS: Dict[str, float] = {
+    "www.mse.mk": 10,
+    "api.seinet.com.mk": 10
+}
+
+# Indexes into the shared state array
+TOKENS, UPDATED_AT, REQUESTS, WAITS, TOTAL_WAIT, MAX_WAIT = range(6)
+
+
+class HostRateLimiter:
+    """Token bucket kept in shared memory so that every process and coroutine of a run draws from it"""
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.lock = multiprocessing.Lock()
+        self.state = multiprocessing.RawArray("d", [self.capacity, time.monotonic(), 0, 0, 0, 0])
+
+    async def acquire(self) -> float:
+        """Wait for a token and return how long the caller waited"""
+        start = time.monotonic()
+        waited = 0.0
+
+        while (delay := self._take_token()) > 0:
+            await asyncio.sleep(delay)
+            waited = time.monotonic() - start
+
+        self._record(waited)
+        return waited
+
+    def _take_token(self) -> float:
+        """Take a token if one is available, otherwise return the time until the next one"""
+        with self.lock:
+            now = time.monotonic()
+            tokens = min(self.capacity, self.state[TOKENS] + (now - self.state[UPDATED_AT]) * self.rate)
+            self.state[UPDATED_AT] = now
+
+            if tokens >= 1:
+                self.state[TOKENS] = tokens - 1
+                return 0
+
+            self.state[TOKENS] = tokens
+            return (1 - tokens) / self.rate
+
+    def _record(self, waited: float) -> None:
+        with self.lock:
+            self.state[REQUESTS] += 1
+
+            if waited > 0:
+                self.state[WAITS] += 1
+                self.state[TOTAL_WAIT] += waited
+                self.state[MAX_WAIT] = max(self.state[MAX_WAIT], waited)
+
+    def stats(self) -> Dict[str, float]:
+        """Wait statistics accumulated by all processes"""
+        with self.lock:
+            requests = self.state[REQUESTS]
+            return {
+                "requests": int(requests),
+                "waits": int(self.state[WAITS]),
+                "total_wait": self.state[TOTAL_WAIT],
+                "avg_wait": self.state[TOTAL_WAIT] / requests if requests else 0.0,
+                "max_wait": self.state[MAX_WAIT]
+            }
+
+
+class RateLimits:
+    """Per-host rate limiters of a run, created before worker processes are started"""
+    def __init__(self, limits: Dict[str, float]) -> None:
+        self.limiters = {host: HostRateLimiter(rate) for host, rate in limits.items()}
+
+    def for_url(self, url: str) -> Optional[HostRateLimiter]:
+        return self.limiters.get(urlsplit(url).hostname or "")
+
+    def report(self) -> List[str]:
+        """Human readable wait statistics for every host"""
+        lines = []
+
+        for host, limiter in self.limiters.items():
+            stats = limiter.stats()
+            lines.append(
+                f"{host}: {stats['requests']} requests at {limiter.rate:g}/s, "
+                f"{stats['waits']} waited {stats['total_wait']:.2f}s in total "
+                f"(avg {stats['avg_wait']:.3f}s, max {stats['max_wait']:.2f}s)"
+            )
+
+        return lines
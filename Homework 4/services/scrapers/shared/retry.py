@@ -0,0 +1,119 @@
+import time
+import random
+from typing import Dict, FrozenSet, Mapping, Optional
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+
+class HttpError(Exception):
+    """Request that did not succeed after all retry attempts"""
+    def __init__(self, url: str, message: str, status: Optional[int] = None) -> None:
+        super().__init__(f"{message} ({url})")
+        self.url = url
+        self.status = status
+
+
+class CircuitOpenError(HttpError):
+    """Request rejected because the circuit breaker of its host is open"""
+
+
+class CacheMissError(HttpError):
+    """Request that offline mode cannot serve because its response was never cached"""
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter and a bounded number of attempts"""
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 30,
+                 retry_statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = retry_statuses
+
+    def should_retry(self, status: int) -> bool:
+        return status in self.retry_statuses
+
+    def delay(self, attempt: int, headers: Optional[Mapping[str, str]] = None) -> float:
+        """Seconds to wait before the given retry attempt (1-based), honouring Retry-After"""
+        if headers and (retry_after := parse_retry_after(headers.get("Retry-After"))) is not None:
+            return min(retry_after, self.max_delay)
+
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Stops sending requests to a host after repeated failures until a cool-down has passed"""
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_started_at: Optional[float] = None
+
+    def allow(self) -> bool:
+        """Whether a request may be sent; after the cool-down a single trial request is let through at a time"""
+        if self.opened_at is None:
+            return True
+
+        now = time.monotonic()
+
+        if now - self.opened_at < self.reset_timeout:
+            return False
+
+        # A trial that never reported back, for example because it was cancelled, is replaced after another cool-down
+        if self.trial_started_at is not None and now - self.trial_started_at < self.reset_timeout:
+            return False
+
+        self.trial_started_at = now
+        return True
+
+    def release(self) -> None:
+        """Let another trial through when the current one ended without a verdict on the host"""
+        self.trial_started_at = None
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial_started_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.trial_started_at = None
+
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class CircuitBreakers:
+    """One circuit breaker per host"""
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def for_host(self, host: str) -> CircuitBreaker:
+        if host not in self.breakers:
+            self.breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+
+        return self.breakers[host]
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either in seconds or as an HTTP date"""
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
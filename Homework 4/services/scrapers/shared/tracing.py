@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import argparse
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+
+def new_id() -> str:
+    return os.urandom(8).hex()
+
+
+class Span:
+    """Timed unit of work; spans opened while another one is current become its children"""
+    def __init__(self, name: str, attributes: Dict[str, Any], parent: Optional["Span"]) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.trace_id = parent.trace_id if parent else new_id()
+        self.span_id = new_id()
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time()
+        self.duration = 0.0
+        self.error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add(self, name: str, amount: float = 1) -> None:
+        """Increase a numeric attribute, such as a byte or row count"""
+        self.attributes[name] = self.attributes.get(name, 0) + amount
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "trace": self.trace_id,
+            "span": self.span_id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration": self.duration,
+            "pid": os.getpid(),
+            "error": self.error,
+            **self.attributes
+        }, default=str)
+
+
+class NoopSpan(Span):
+    """Span handed out while tracing is disabled; it records nothing"""
+    def __init__(self) -> None:
+        super().__init__("noop", {}, None)
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def add(self, name: str, amount: float = 1) -> None:
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Writes one JSON line per finished span to a file shared by every process of a run"""
+    def __init__(self, path: Optional[str]) -> None:
+        self.path = path
+        self.fd: Optional[int] = None
+        self.pid: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+
+        span = Span(name, attributes, current_span.get())
+        token = current_span.set(span)
+        start = time.perf_counter()
+
+        try:
+            yield span
+        except BaseException as e:
+            span.error = repr(e)
+            raise
+        finally:
+            span.duration = time.perf_counter() - start
+            current_span.reset(token)
+            self.write(span)
+
+    def annotate(self, **attributes: Any) -> None:
+        """Add attributes, such as the issuer code, to the span of the running task"""
+        if self.enabled and (span := current_span.get()) is not None:
+            span.set(**attributes)
+
+    def write(self, span: Span) -> None:
+        # Each process opens the file itself; O_APPEND keeps lines written by different processes whole
+        if self.fd is None or self.pid != os.getpid():
+            self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            self.pid = os.getpid()
+
+        os.write(self.fd, (span.to_json() + "\n").encode("utf-8"))
+
+
+def summarize(path: str, name: str, top: int) -> List[str]:
+    """Slowest spans of a kind, together with the time their children spent per kind"""
+    spans: List[Dict[str, Any]] = []
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                spans.append(json.loads(line))
+            except ValueError:
+                continue  # Line cut short by a killed process
+
+    children: Dict[str, Dict[str, float]] = {}
+
+    for span in spans:
+        if span["parent"]:
+            breakdown = children.setdefault(span["parent"], {})
+            breakdown[span["name"]] = breakdown.get(span["name"], 0) + span["duration"]
+
+    selected = sorted((span for span in spans if span["name"] == name), key=lambda span: -span["duration"])
+    total = sum(span["duration"] for span in selected)
+    lines = [f"{len(selected)} {name} spans, {total:.2f}s in total"]
+
+    for span in selected[:top]:
+        attributes = {key: value for key, value in span.items()
+                      if key not in ("trace", "span", "parent", "name", "start", "duration", "pid", "error")}
+        breakdown = ", ".join(f"{child} {seconds:.2f}s"
+                              for child, seconds in sorted(children.get(span["span"], {}).items(),
+                                                           key=lambda child: -child[1]))
+        lines.append(f"{span['duration']:8.2f}s {json.dumps(attributes, default=str)}"
+                     f"{' ERROR ' + span['error'] if span['error'] else ''}{' (' + breakdown + ')' if breakdown else ''}")
+
+    return lines
+
+
+# Tracer of the current process, enabled by pointing TRACE_FILE at the file to append spans to
+tracer = Tracer(os.getenv("TRACE_FILE"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the slowest spans of a trace file")
+    parser.add_argument("path")
+    parser.add_argument("--name", default="item", help="span name to rank, such as item or http_fetch")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    for line in summarize(args.path, args.name, args.top):
+        print(line)
@@ -0,0 +1,5 @@
+import os
+
+# Upstream base URLs, overridable to point the scrapers at a stand-in such as the fixture server
+MSE_BASE_URL = os.getenv("MSE_BASE_URL", "https://www.mse.mk").rstrip("/")
+SEINET_API_URL = os.getenv("SEINET_API_URL", "https://api.seinet.com.mk").rstrip("/")
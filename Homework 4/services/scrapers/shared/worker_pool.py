@@ -0,0 +1,117 @@
+import asyncio
+import multiprocessing
+from queue import Empty
+from typing import Any, List, Optional, Type
+from .base_scraper import BaseScraper, T, R
+from .concurrency import process_concurrently
+from .database import Database
+from .metrics import Snapshot, metrics
+from .rate_limiter import RateLimits
+
+# Type aliases
+Task = tuple[Optional[int], List[Any]]  # (run id the items are journaled under, batch of items)
+BatchResult = tuple[int, int]  # (processed, failed)
+WorkerResult = tuple[int, int, Snapshot]  # (processed, failed, metrics recorded while processing the batch)
+
+
+class WorkerPool:
+    """Long-lived worker processes, each owning one event loop, one small database pool and one HTTP session"""
+    def __init__(self, scraper_class: Type[BaseScraper[T, R]], db_params: dict[str, str], http_params: dict[str, Any],
+                 rate_limits: RateLimits, process_count: int, concurrency: int) -> None:
+        self.scraper_class = scraper_class
+        self.db_params = db_params
+        self.http_params = http_params
+        self.rate_limits = rate_limits
+        self.process_count = process_count
+        self.concurrency = concurrency
+        self.tasks: multiprocessing.Queue = multiprocessing.Queue()
+        self.results: multiprocessing.Queue = multiprocessing.Queue()
+        self.processes: List[multiprocessing.Process] = []
+
+    def start(self) -> None:
+        """Start the worker processes"""
+        for _ in range(self.process_count):
+            process = multiprocessing.Process(
+                target=worker_main,
+                args=(self.scraper_class, self.db_params, self.http_params, self.rate_limits, self.concurrency,
+                      self.tasks, self.results)
+            )
+            process.start()
+            self.processes.append(process)
+
+    async def map(self, items: List[T], batch_size: int, run_id: Optional[int] = None) -> BatchResult:
+        """Hand items to the workers in batches and wait until all of them are processed"""
+        batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+        for batch in batches:
+            self.tasks.put((run_id, batch))
+
+        processed, failed = 0, 0
+
+        for _ in batches:
+            batch_processed, batch_failed, snapshot = await self._next_result()
+            metrics.merge(snapshot)
+            processed += batch_processed
+            failed += batch_failed
+
+        return processed, failed
+
+    async def _next_result(self) -> WorkerResult:
+        while True:
+            try:
+                return await asyncio.to_thread(self.results.get, True, 1)
+            except Empty:
+                if not all(process.is_alive() for process in self.processes):
+                    raise RuntimeError("A worker process exited unexpectedly")
+
+    def stop(self) -> None:
+        """Ask the workers to finish and wait for them to exit"""
+        for process in self.processes:
+            if process.is_alive():
+                self.tasks.put(None)
+
+        for process in self.processes:
+            process.join(timeout=30)
+
+            if process.is_alive():
+                process.terminate()
+
+        self.processes = []
+
+
+def worker_main(scraper_class: Type[BaseScraper[T, R]], db_params: dict[str, str], http_params: dict[str, Any],
+                rate_limits: RateLimits, concurrency: int, tasks: multiprocessing.Queue,
+                results: multiprocessing.Queue) -> None:
+    """Entry point of a worker process"""
+    asyncio.run(run_worker(scraper_class, db_params, http_params, rate_limits, concurrency, tasks, results))
+
+
+async def run_worker(scraper_class: Type[BaseScraper[T, R]], db_params: dict[str, str], http_params: dict[str, Any],
+                     rate_limits: RateLimits, concurrency: int, tasks: multiprocessing.Queue,
+                     results: multiprocessing.Queue) -> None:
+    """Process batches from the task queue until a stop sentinel arrives"""
+    metrics.drain()  # Forked workers inherit what the parent recorded so far
+    metrics.set_labels(component=scraper_class.__name__)
+    scraper = scraper_class(db_params, http_params)
+    scraper.http.rate_limits = rate_limits  # Share the parent's limiters instead of per-process ones
+    scraper.db = Database(**db_params, max_size=concurrency)
+    await scraper.db.connect()
+    await scraper.connect_http()
+
+    loop = asyncio.get_running_loop()
+
+    try:
+        while True:
+            task: Optional[Task] = await loop.run_in_executor(None, tasks.get)
+
+            if task is None:
+                break
+
+            # Journal item states under the parent's run, which changes between the runs of a daemon
+            scraper.run_id, batch = task
+
+            failed = await process_concurrently(scraper.execute_item, batch, concurrency)
+            await scraper.flush_journal()  # The parent closes the run once every batch is reported
+            results.put((len(batch), failed, metrics.drain()))
+    finally:
+        await scraper.cleanup()